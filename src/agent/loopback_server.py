@@ -0,0 +1,83 @@
+import socketserver
+import sys
+import threading
+
+import orjson
+
+from agent.sim_agent import HEADER_SIZE
+
+
+"""
+Loopback stand-in for the sim server, to exercise the transport without a sim:
+
+    python src/agent/loopback_server.py 1234
+
+It speaks the same length-prefixed protocol and acknowledges every request.
+GET_STATE echoes the last START_SIM_SESSION request and the time waited since.
+"""
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    def handle(self):
+        session = None
+        while True:
+            header = self._recv_exactly(HEADER_SIZE)
+            if header is None:
+                return
+            request = orjson.loads(
+                self._recv_exactly(int.from_bytes(header, byteorder="little"))
+            )
+            command = request["command"]
+            body = None
+            if command == "START_SIM_SESSION":
+                session = dict(request=request["body"], currentTime=0, casts=[])
+            elif command == "WAIT_DURATION":
+                session["currentTime"] += request["body"]["duration"]
+            elif command == "CAST":
+                session["casts"].append(request["body"]["spell"])
+            elif command == "GET_STATE":
+                body = session
+            response = orjson.dumps({"Success": True, "Body": body})
+            self.request.sendall(
+                len(response).to_bytes(HEADER_SIZE, byteorder="little") + response
+            )
+
+    def _recv_exactly(self, size):
+        data = b""
+        while len(data) < size:
+            chunk = self.request.recv(size - len(data))
+            if not chunk:
+                return None
+            data += chunk
+        return data
+
+
+class LoopbackSimServer(socketserver.ThreadingTCPServer):
+    """Binds to 127.0.0.1, port 0 picks a free port, see `endpoint`"""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, port=0):
+        super().__init__(("127.0.0.1", port), _Handler)
+
+    @property
+    def endpoint(self):
+        host, port = self.server_address
+        return f"tcp://{host}:{port}"
+
+    def start(self):
+        threading.Thread(
+            target=self.serve_forever, name="loopback-sim-server", daemon=True
+        ).start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+if __name__ == "__main__":
+    server = LoopbackSimServer(int(sys.argv[1]) if len(sys.argv) > 1 else 0)
+    print(f"Serving on {server.endpoint}")
+    server.serve_forever()
@@ -2,8 +2,10 @@ import orjson
 import socket
 import sys
 from typing import Optional
+from urllib.parse import urlsplit
 
 from logger import logger
+from logger.timing import timed
 from agent.sim_config import create_config
 
 
@@ -22,8 +24,18 @@ class SimRequest:
 
 
 class StartSimSession(SimRequest):
+    """`sim_config` is already serialized, see create_config"""
+
     def __init__(self, sim_config):
-        super().__init__("START_SIM_SESSION", {"RaidSimRequest": sim_config})
+        super().__init__("START_SIM_SESSION", None)
+        self._sim_config = sim_config
+
+    def serialize(self):
+        return (
+            b'{"command":"START_SIM_SESSION","body":{"RaidSimRequest":'
+            + self._sim_config
+            + b"}}"
+        )
 
 
 class GetState(SimRequest):
@@ -42,6 +54,7 @@ class WaitDuration(SimRequest):
 
 
 class SimResponse:
+    @timed("SimResponse")
     def __init__(self, raw_response):
         self._raw_response = raw_response
         self._json = orjson.loads(raw_response)
@@ -55,15 +68,60 @@ class SimResponse:
         return self._json["Body"]
 
 
+DEFAULT_ENDPOINT = "unix:///tmp/sim-agent.sock"
+
+HEADER_SIZE = 4
+
+
+def parse_endpoint(endpoint):
+    """
+    Resolve an endpoint URI into a socket family and address.
+
+    Accepts `unix:///path/to.sock`, `tcp://host:port` or a bare socket path.
+    """
+    parts = urlsplit(endpoint)
+    if parts.scheme == "tcp":
+        if parts.hostname is None or parts.port is None:
+            raise ValueError("%s is not a valid tcp endpoint" % endpoint)
+        return socket.AF_INET, (parts.hostname, parts.port)
+    if parts.scheme == "unix":
+        return socket.AF_UNIX, parts.path
+    if parts.scheme == "":
+        return socket.AF_UNIX, endpoint
+    raise ValueError("%s is not a supported endpoint scheme" % parts.scheme)
+
+
 class SimConnection:
-    def __init__(self, port):
+    def __init__(self, endpoint, timeout=1.0):
         self._connection: Optional[socket.socket] = None
-        self._port = port
+        self._endpoint = endpoint
+        self._timeout = timeout
 
     def connect(self):
-        self._connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
-        self._connection.settimeout(1.0)
-        self._connection.connect(self._port)
+        family, address = parse_endpoint(self._endpoint)
+        if family == socket.AF_INET:
+            self._connection = socket.create_connection(address, self._timeout)
+            self._configure_tcp(self._connection)
+        else:
+            self._connection = socket.socket(family, socket.SOCK_STREAM)
+            self._connection.settimeout(self._timeout)
+            self._connection.connect(address)
+
+    @staticmethod
+    def _configure_tcp(connection):
+        # requests are tiny and strictly request/response, so never batch them
+        connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        connection.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        # tighter keepalive probes so a dead sim host is noticed in under a minute
+        for option, value in (
+            ("TCP_KEEPIDLE", 30),
+            ("TCP_KEEPINTVL", 5),
+            ("TCP_KEEPCNT", 3),
+        ):
+            if hasattr(socket, option):
+                connection.setsockopt(
+                    socket.IPPROTO_TCP, getattr(socket, option), value
+                )
 
     def disconnect(self):
         try:
@@ -77,36 +135,49 @@ class SimConnection:
     def is_connected(self):
         return self._connection is not None
 
+    @timed("SimConnection.send_request")
     def send_request(self, request: SimRequest):
         if not self.is_connected:
             raise Exception("Not connected")
 
         body = request.serialize()
         logger.debug("Sending request", body)
-        payload = len(body).to_bytes(4, byteorder="little") + body
+        payload = len(body).to_bytes(HEADER_SIZE, byteorder="little") + body
         self._connection.sendall(payload)
         logger.debug("finished sending request")
 
-        buffer = self._connection.recv(1024 * 15)
-        response_length = int.from_bytes(buffer[:4], byteorder="little")
-        response = buffer[4 : 4 + response_length]
+        header = self._recv_exactly(HEADER_SIZE)
+        response_length = int.from_bytes(header, byteorder="little")
+        response = self._recv_exactly(response_length)
 
         response = SimResponse(response)
         assert response.success
         return response.body
 
+    def _recv_exactly(self, size):
+        # stream sockets (TCP in particular) may split a frame across reads
+        buffer = bytearray(size)
+        view = memoryview(buffer)
+        received = 0
+        while received < size:
+            count = self._connection.recv_into(view[received:], size - received)
+            if count == 0:
+                raise ConnectionError("Sim server closed the connection")
+            received += count
+        return buffer
+
     # pickle support
     def __getstate__(self):
-        return self._port
+        return self._endpoint, self._timeout
 
-    def __setstate__(self, port):
-        self._port = port
+    def __setstate__(self, state):
+        self._endpoint, self._timeout = state
         self._connection = None
 
 
 class SimAgent:
-    def __init__(self, port, step_duration_msec):
-        self._connection = SimConnection(port)
+    def __init__(self, endpoint, step_duration_msec):
+        self._connection = SimConnection(endpoint)
         self._state = None
         self._step_duration_msec = step_duration_msec
 
@@ -150,7 +221,7 @@ class SimAgent:
 
 
 if __name__ == "__main__":
-    agent = SimAgent(port=sys.argv[1])
+    agent = SimAgent(endpoint=sys.argv[1], step_duration_msec=50)
 
     sim_config = create_config(random_seed=0)
     state = agent.reset(sim_config)
@@ -1,2994 +1,43 @@
-from copy import deepcopy
+import os
+import re
+from functools import lru_cache
 
-SIM_CONFIG = {
-    "raid": {
-        "parties": [
-            {
-                "players": [
-                    {
-                        "name": "Player",
-                        "race": "RaceOrc",
-                        "class": "ClassDeathknight",
-                        "equipment": {
-                            "items": [
-                                {"id": 46115, "enchant": 3817, "gems": [41398, 42702]},
-                                {"id": 45459, "gems": [39996]},
-                                {"id": 46117, "enchant": 3808, "gems": [39996]},
-                                {"id": 46032, "enchant": 3831, "gems": [39996, 39996]},
-                                {"id": 46111, "enchant": 3832, "gems": [42142, 42142]},
-                                {"id": 45663, "enchant": 3845, "gems": [39996, 0]},
-                                {"id": 46113, "enchant": 3604, "gems": [39996, 0]},
-                                {"id": 45241, "gems": [42142, 45862, 39996]},
-                                {
-                                    "id": 45134,
-                                    "enchant": 3823,
-                                    "gems": [39996, 39996, 39996],
-                                },
-                                {"id": 45599, "enchant": 3606, "gems": [39996, 39996]},
-                                {"id": 45608, "gems": [39996]},
-                                {"id": 45534, "gems": [39996]},
-                                {"id": 45931},
-                                {"id": 42987},
-                                {"id": 46097, "enchant": 3370, "gems": [39996]},
-                                {"id": 46097, "enchant": 3368, "gems": [39996]},
-                                {"id": 40207},
-                            ]
-                        },
-                        "consumes": {
-                            "flask": "FlaskOfEndlessRage",
-                            "food": "FoodDragonfinFilet",
-                            "petFood": "PetFoodSpicedMammothTreats",
-                            "defaultPotion": "PotionOfSpeed",
-                            "prepopPotion": "PotionOfSpeed",
-                            "thermalSapper": True,
-                            "fillerExplosive": "ExplosiveSaroniteBomb",
-                        },
-                        "bonusStats": {
-                            "stats": [
-                                0,
-                                0,
-                                0,
-                                0,
-                                0,
-                                0,
-                                0,
-                                0,
-                                0,
-                                0,
-                                0,
-                                0,
-                                0,
-                                0,
-                                0,
-                                0,
-                                0,
-                                0,
-                                0,
-                                0,
-                                0,
-                                0,
-                                0,
-                                0,
-                                0,
-                                0,
-                                0,
-                                0,
-                                0,
-                                0,
-                                0,
-                                0,
-                                0,
-                                0,
-                                0,
-                            ],
-                            "pseudoStats": [0, 0, 0, 0, 0, 0],
-                        },
-                        "buffs": {
-                            "blessingOfKings": True,
-                            "blessingOfMight": "TristateEffectImproved",
-                        },
-                        "talentsString": "23050005-32005350352203012300033101351",
-                        "glyphs": {
-                            "major1": 43547,
-                            "major2": 43543,
-                            "major3": 45805,
-                            "minor1": 43544,
-                            "minor2": 43672,
-                            "minor3": 43673,
-                        },
-                        "profession1": "Engineering",
-                        "profession2": "Jewelcrafting",
-                        "cooldowns": {},
-                        "healingModel": {},
-                        "database": {
-                            "items": [
-                                {
-                                    "id": 46115,
-                                    "name": "Conqueror's Darkruned Helmet",
-                                    "type": "ItemTypeHead",
-                                    "armorType": "ArmorTypePlate",
-                                    "stats": [
-                                        112,
-                                        0,
-                                        137,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        75,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        75,
-                                        0,
-                                        52,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        1958,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                    ],
-                                    "gemSockets": ["GemColorMeta", "GemColorBlue"],
-                                    "socketBonus": [
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        8,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        8,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                    ],
-                                    "setName": "Darkruned Battlegear",
-                                },
-                                {
-                                    "id": 45459,
-                                    "name": "Frigid Strength of Hodir",
-                                    "type": "ItemTypeNeck",
-                                    "stats": [
-                                        84,
-                                        0,
-                                        92,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        45,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        45,
-                                        0,
-                                        0,
-                                        54,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                    ],
-                                    "gemSockets": ["GemColorBlue"],
-                                    "socketBonus": [
-                                        4,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                    ],
-                                },
-                                {
-                                    "id": 46117,
-                                    "name": "Conqueror's Darkruned Shoulderplates",
-                                    "type": "ItemTypeShoulder",
-                                    "armorType": "ArmorTypePlate",
-                                    "stats": [
-                                        95,
-                                        0,
-                                        108,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        43,
-                                        0,
-                                        59,
-                                        0,
-                                        0,
-                                        43,
-                                        0,
-                                        59,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        1807,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                    ],
-                                    "gemSockets": ["GemColorBlue"],
-                                    "socketBonus": [
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        4,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        4,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                    ],
-                                    "setName": "Darkruned Battlegear",
-                                },
-                                {
-                                    "id": 46032,
-                                    "name": "Drape of the Faceless General",
-                                    "type": "ItemTypeBack",
-                                    "stats": [
-                                        0,
-                                        60,
-                                        63,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        46,
-                                        0,
-                                        0,
-                                        105,
-                                        0,
-                                        46,
-                                        0,
-                                        34,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        166,
-                                        105,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                    ],
-                                    "gemSockets": ["GemColorRed", "GemColorYellow"],
-                                    "socketBonus": [
-                                        0,
-                                        6,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                    ],
-                                },
-                                {
-                                    "id": 46111,
-                                    "name": "Conqueror's Darkruned Battleplate",
-                                    "type": "ItemTypeChest",
-                                    "armorType": "ArmorTypePlate",
-                                    "stats": [
-                                        120,
-                                        0,
-                                        137,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        82,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        82,
-                                        0,
-                                        0,
-                                        58,
-                                        0,
-                                        0,
-                                        0,
-                                        2409,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                    ],
-                                    "gemSockets": ["GemColorYellow", "GemColorBlue"],
-                                    "socketBonus": [
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        6,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        6,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                    ],
-                                    "setName": "Darkruned Battlegear",
-                                },
-                                {
-                                    "id": 45663,
-                                    "name": "Armbands of Bedlam",
-                                    "type": "ItemTypeWrist",
-                                    "armorType": "ArmorTypePlate",
-                                    "stats": [
-                                        84,
-                                        0,
-                                        92,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        54,
-                                        45,
-                                        0,
-                                        0,
-                                        0,
-                                        54,
-                                        45,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        1115,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                    ],
-                                    "gemSockets": ["GemColorRed"],
-                                    "socketBonus": [
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        6,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        6,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                    ],
-                                },
-                                {
-                                    "id": 46113,
-                                    "name": "Conqueror's Darkruned Gauntlets",
-                                    "type": "ItemTypeHands",
-                                    "armorType": "ArmorTypePlate",
-                                    "stats": [
-                                        95,
-                                        0,
-                                        108,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        59,
-                                        45,
-                                        0,
-                                        0,
-                                        0,
-                                        59,
-                                        45,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        1505,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                    ],
-                                    "gemSockets": ["GemColorBlue"],
-                                    "socketBonus": [
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        4,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        4,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                    ],
-                                    "setName": "Darkruned Battlegear",
-                                },
-                                {
-                                    "id": 45241,
-                                    "name": "Belt of Colossal Rage",
-                                    "type": "ItemTypeWaist",
-                                    "armorType": "ArmorTypePlate",
-                                    "stats": [
-                                        106,
-                                        0,
-                                        123,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        54,
-                                        73,
-                                        0,
-                                        0,
-                                        0,
-                                        54,
-                                        73,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        1434,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                    ],
-                                    "gemSockets": ["GemColorBlue", "GemColorYellow"],
-                                    "socketBonus": [
-                                        6,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                    ],
-                                },
-                                {
-                                    "id": 45134,
-                                    "name": "Plated Leggings of Ruination",
-                                    "type": "ItemTypeLegs",
-                                    "armorType": "ArmorTypePlate",
-                                    "stats": [
-                                        140,
-                                        0,
-                                        166,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        97,
-                                        71,
-                                        0,
-                                        0,
-                                        0,
-                                        97,
-                                        71,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        2230,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                    ],
-                                    "gemSockets": [
-                                        "GemColorYellow",
-                                        "GemColorRed",
-                                        "GemColorBlue",
-                                    ],
-                                    "socketBonus": [
-                                        8,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                    ],
-                                },
-                                {
-                                    "id": 45599,
-                                    "name": "Sabatons of Lifeless Night",
-                                    "type": "ItemTypeFeet",
-                                    "armorType": "ArmorTypePlate",
-                                    "stats": [
-                                        106,
-                                        0,
-                                        123,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        73,
-                                        54,
-                                        0,
-                                        0,
-                                        0,
-                                        73,
-                                        54,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        1752,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                    ],
-                                    "gemSockets": ["GemColorYellow", "GemColorBlue"],
-                                    "socketBonus": [
-                                        4,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                    ],
-                                },
-                                {
-                                    "id": 45608,
-                                    "name": "Brann's Signet Ring",
-                                    "type": "ItemTypeFinger",
-                                    "stats": [
-                                        0,
-                                        73,
-                                        70,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        49,
-                                        0,
-                                        0,
-                                        109,
-                                        0,
-                                        49,
-                                        0,
-                                        37,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        109,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                    ],
-                                    "gemSockets": ["GemColorBlue"],
-                                    "socketBonus": [
-                                        0,
-                                        4,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                    ],
-                                },
-                                {
-                                    "id": 45534,
-                                    "name": "Seal of the Betrayed King",
-                                    "type": "ItemTypeFinger",
-                                    "stats": [
-                                        84,
-                                        0,
-                                        92,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        45,
-                                        54,
-                                        0,
-                                        0,
-                                        0,
-                                        45,
-                                        54,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                    ],
-                                    "gemSockets": ["GemColorBlue"],
-                                    "socketBonus": [
-                                        4,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                    ],
-                                },
-                                {
-                                    "id": 45931,
-                                    "name": "Mjolnir Runestone",
-                                    "type": "ItemTypeTrinket",
-                                    "stats": [
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        115,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        115,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                    ],
-                                    "socketBonus": [
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                    ],
-                                },
-                                {
-                                    "id": 42987,
-                                    "name": "Darkmoon Card: Greatness",
-                                    "type": "ItemTypeTrinket",
-                                    "stats": [
-                                        90,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                    ],
-                                    "socketBonus": [
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                    ],
-                                },
-                                {
-                                    "id": 46097,
-                                    "name": "Caress of Insanity",
-                                    "type": "ItemTypeWeapon",
-                                    "weaponType": "WeaponTypeMace",
-                                    "handType": "HandTypeOneHand",
-                                    "stats": [
-                                        0,
-                                        45,
-                                        48,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        28,
-                                        0,
-                                        118,
-                                        0,
-                                        0,
-                                        28,
-                                        0,
-                                        39,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        118,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                    ],
-                                    "gemSockets": ["GemColorRed"],
-                                    "socketBonus": [
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        8,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        8,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                    ],
-                                    "weaponDamageMin": 371,
-                                    "weaponDamageMax": 690,
-                                    "weaponSpeed": 2.7,
-                                },
-                                {
-                                    "id": 46097,
-                                    "name": "Caress of Insanity",
-                                    "type": "ItemTypeWeapon",
-                                    "weaponType": "WeaponTypeMace",
-                                    "handType": "HandTypeOneHand",
-                                    "stats": [
-                                        0,
-                                        45,
-                                        48,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        28,
-                                        0,
-                                        118,
-                                        0,
-                                        0,
-                                        28,
-                                        0,
-                                        39,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        118,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                    ],
-                                    "gemSockets": ["GemColorRed"],
-                                    "socketBonus": [
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        8,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        8,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                    ],
-                                    "weaponDamageMin": 371,
-                                    "weaponDamageMax": 690,
-                                    "weaponSpeed": 2.7,
-                                },
-                                {
-                                    "id": 40207,
-                                    "name": "Sigil of Awareness",
-                                    "type": "ItemTypeRanged",
-                                    "rangedWeaponType": "RangedWeaponTypeSigil",
-                                    "stats": [
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                    ],
-                                    "socketBonus": [
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                    ],
-                                },
-                            ],
-                            "enchants": [
-                                {
-                                    "effectId": 3817,
-                                    "stats": [
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        20,
-                                        0,
-                                        0,
-                                        50,
-                                        0,
-                                        20,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        50,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                    ],
-                                },
-                                {
-                                    "effectId": 3808,
-                                    "stats": [
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        15,
-                                        0,
-                                        0,
-                                        40,
-                                        0,
-                                        15,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        40,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                    ],
-                                },
-                                {
-                                    "effectId": 3831,
-                                    "stats": [
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        23,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        23,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                    ],
-                                },
-                                {
-                                    "effectId": 3832,
-                                    "stats": [
-                                        10,
-                                        10,
-                                        10,
-                                        10,
-                                        10,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                    ],
-                                },
-                                {
-                                    "effectId": 3845,
-                                    "stats": [
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        50,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        50,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                    ],
-                                },
-                                {
-                                    "effectId": 3604,
-                                    "stats": [
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                    ],
-                                },
-                                {
-                                    "effectId": 3823,
-                                    "stats": [
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        22,
-                                        0,
-                                        0,
-                                        75,
-                                        0,
-                                        22,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        75,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                    ],
-                                },
-                                {
-                                    "effectId": 3606,
-                                    "stats": [
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        24,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        24,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                    ],
-                                },
-                                {
-                                    "effectId": 3370,
-                                    "stats": [
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                    ],
-                                },
-                                {
-                                    "effectId": 3368,
-                                    "stats": [
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                    ],
-                                },
-                            ],
-                            "gems": [
-                                {
-                                    "id": 41398,
-                                    "name": "Relentless Earthsiege Diamond",
-                                    "color": "GemColorMeta",
-                                    "stats": [
-                                        0,
-                                        21,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                    ],
-                                },
-                                {
-                                    "id": 42702,
-                                    "name": "Enchanted Tear",
-                                    "color": "GemColorPrismatic",
-                                    "stats": [
-                                        6,
-                                        6,
-                                        6,
-                                        6,
-                                        6,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                    ],
-                                },
-                                {
-                                    "id": 39996,
-                                    "name": "Bold Scarlet Ruby",
-                                    "color": "GemColorRed",
-                                    "stats": [
-                                        16,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                    ],
-                                },
-                                {
-                                    "id": 39996,
-                                    "name": "Bold Scarlet Ruby",
-                                    "color": "GemColorRed",
-                                    "stats": [
-                                        16,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                    ],
-                                },
-                                {
-                                    "id": 39996,
-                                    "name": "Bold Scarlet Ruby",
-                                    "color": "GemColorRed",
-                                    "stats": [
-                                        16,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                    ],
-                                },
-                                {
-                                    "id": 39996,
-                                    "name": "Bold Scarlet Ruby",
-                                    "color": "GemColorRed",
-                                    "stats": [
-                                        16,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                    ],
-                                },
-                                {
-                                    "id": 42142,
-                                    "name": "Bold Dragon's Eye",
-                                    "color": "GemColorRed",
-                                    "stats": [
-                                        34,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                    ],
-                                },
-                                {
-                                    "id": 42142,
-                                    "name": "Bold Dragon's Eye",
-                                    "color": "GemColorRed",
-                                    "stats": [
-                                        34,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                    ],
-                                },
-                                {
-                                    "id": 39996,
-                                    "name": "Bold Scarlet Ruby",
-                                    "color": "GemColorRed",
-                                    "stats": [
-                                        16,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                    ],
-                                },
-                                {
-                                    "id": 39996,
-                                    "name": "Bold Scarlet Ruby",
-                                    "color": "GemColorRed",
-                                    "stats": [
-                                        16,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                    ],
-                                },
-                                {
-                                    "id": 42142,
-                                    "name": "Bold Dragon's Eye",
-                                    "color": "GemColorRed",
-                                    "stats": [
-                                        34,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                    ],
-                                },
-                                {
-                                    "id": 45862,
-                                    "name": "Bold Stormjewel",
-                                    "color": "GemColorRed",
-                                    "stats": [
-                                        20,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                    ],
-                                },
-                                {
-                                    "id": 39996,
-                                    "name": "Bold Scarlet Ruby",
-                                    "color": "GemColorRed",
-                                    "stats": [
-                                        16,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                    ],
-                                },
-                                {
-                                    "id": 39996,
-                                    "name": "Bold Scarlet Ruby",
-                                    "color": "GemColorRed",
-                                    "stats": [
-                                        16,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                    ],
-                                },
-                                {
-                                    "id": 39996,
-                                    "name": "Bold Scarlet Ruby",
-                                    "color": "GemColorRed",
-                                    "stats": [
-                                        16,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                    ],
-                                },
-                                {
-                                    "id": 39996,
-                                    "name": "Bold Scarlet Ruby",
-                                    "color": "GemColorRed",
-                                    "stats": [
-                                        16,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                    ],
-                                },
-                                {
-                                    "id": 39996,
-                                    "name": "Bold Scarlet Ruby",
-                                    "color": "GemColorRed",
-                                    "stats": [
-                                        16,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                    ],
-                                },
-                                {
-                                    "id": 39996,
-                                    "name": "Bold Scarlet Ruby",
-                                    "color": "GemColorRed",
-                                    "stats": [
-                                        16,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                    ],
-                                },
-                                {
-                                    "id": 39996,
-                                    "name": "Bold Scarlet Ruby",
-                                    "color": "GemColorRed",
-                                    "stats": [
-                                        16,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                    ],
-                                },
-                                {
-                                    "id": 39996,
-                                    "name": "Bold Scarlet Ruby",
-                                    "color": "GemColorRed",
-                                    "stats": [
-                                        16,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                    ],
-                                },
-                                {
-                                    "id": 39996,
-                                    "name": "Bold Scarlet Ruby",
-                                    "color": "GemColorRed",
-                                    "stats": [
-                                        16,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                    ],
-                                },
-                                {
-                                    "id": 39996,
-                                    "name": "Bold Scarlet Ruby",
-                                    "color": "GemColorRed",
-                                    "stats": [
-                                        16,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                        0,
-                                    ],
-                                },
-                            ],
-                        },
-                        "deathknight": {
-                            "rotation": {
-                                "frostRotationType": "SingleTarget",
-                                "useDeathAndDecay": True,
-                                "btGhoulFrenzy": True,
-                                "useEmpowerRuneWeapon": True,
-                                "bloodRuneFiller": "BloodBoil",
-                                "startingPresence": "Unholy",
-                                "holdErwArmy": True,
-                                "useGargoyle": True,
-                                "gargoylePresence": "Unholy",
-                                "drwDiseases": "Pestilence",
-                            },
-                            "options": {
-                                "petUptime": 1,
-                                "precastHornOfWinter": True,
-                                "unholyFrenzyTarget": {"targetIndex": -1},
-                                "drwPestiApply": True,
-                            },
-                        },
-                    },
-                    {},
-                    {},
-                    {},
-                    {},
-                ],
-                "buffs": {},
-            },
-            {"players": [{}, {}, {}, {}, {}], "buffs": {}},
-            {"players": [{}, {}, {}, {}, {}], "buffs": {}},
-            {"players": [{}, {}, {}, {}, {}], "buffs": {}},
-            {"players": [{}, {}, {}, {}, {}], "buffs": {}},
-            {"players": [{}, {}, {}, {}, {}], "buffs": {}},
-            {"players": [{}, {}, {}, {}, {}], "buffs": {}},
-            {"players": [{}, {}, {}, {}, {}], "buffs": {}},
-        ],
-        "numActiveParties": 5,
-        "buffs": {
-            "giftOfTheWild": "TristateEffectRegular",
-            "powerWordFortitude": "TristateEffectRegular",
-            "strengthOfEarthTotem": "TristateEffectImproved",
-            "abominationsMight": True,
-            "leaderOfThePack": "TristateEffectRegular",
-            "icyTalons": True,
-            "totemOfWrath": True,
-            "swiftRetribution": True,
-            "moonkinAura": "TristateEffectRegular",
-            "wrathOfAirTotem": True,
-            "sanctifiedRetribution": True,
-            "bloodlust": True,
-            "devotionAura": "TristateEffectImproved",
-            "stoneskinTotem": "TristateEffectImproved",
-        },
-        "debuffs": {
-            "faerieFire": "TristateEffectImproved",
-            "ebonPlaguebringer": True,
-            "heartOfTheCrusader": True,
-            "totemOfWrath": True,
-            "shadowMastery": True,
-            "bloodFrenzy": True,
-            "mangle": True,
-            "sunderArmor": True,
-        },
-    },
-    "encounter": {
-        "duration": 180,
-        "durationVariation": 5,
-        "executeProportion20": 0.2,
-        "executeProportion25": 0.25,
-        "executeProportion35": 0.35,
-        "targets": [
-            {
-                "level": 83,
-                "mobType": "MobTypeGiant",
-                "stats": [
-                    0,
-                    0,
-                    0,
-                    0,
-                    0,
-                    0,
-                    0,
-                    0,
-                    0,
-                    0,
-                    0,
-                    574,
-                    0,
-                    0,
-                    0,
-                    0,
-                    0,
-                    0,
-                    0,
-                    0,
-                    10643,
-                    0,
-                    0,
-                    0,
-                    0,
-                    0,
-                    0,
-                    0,
-                    0,
-                    0,
-                    0,
-                    0,
-                    0,
-                    0,
-                    0,
-                ],
-                "minBaseDamage": 65000,
-                "swingSpeed": 1.5,
-                "parryHaste": True,
-            }
-        ],
-    },
-    "simOptions": {"iterations": 3000, "randomSeed": 0, "debugFirstIteration": True},
-}
+import orjson
+
+
+"""
+The raid sim request of every episode. The base config lives in
+sim_config.json and is serialized once per process into a template; episodes
+only differ in the random seed and the encounter duration, which are spliced
+into the serialized bytes instead of copying and re-serializing the config.
+"""
+
+SIM_CONFIG_FILE = os.path.join(os.path.dirname(__file__), "sim_config.json")
+
+_PLACEHOLDER = re.compile(rb'"__(\w+)__"')
+
+
+def load_sim_config():
+    with open(SIM_CONFIG_FILE, "rb") as f:
+        return orjson.loads(f.read())
+
+
+@lru_cache(maxsize=None)
+def _template():
+    sim_config = load_sim_config()
+    sim_config["simOptions"]["randomSeed"] = "__random_seed__"
+    sim_config["encounter"]["duration"] = "__duration__"
+    # literal chunks at even, placeholder names at odd positions
+    return tuple(
+        part.decode() if i % 2 else part
+        for i, part in enumerate(_PLACEHOLDER.split(orjson.dumps(sim_config)))
+    )
 
 
 def create_config(random_seed=0, duration=180):
-    sim_config = deepcopy(SIM_CONFIG)
-    sim_config["simOptions"]["randomSeed"] = random_seed
-    sim_config["encounter"]["duration"] = duration
-    return sim_config
+    """The serialized config, see StartSimSession"""
+    values = dict(random_seed=random_seed, duration=duration)
+    return b"".join(
+        orjson.dumps(values[part]) if i % 2 else part
+        for i, part in enumerate(_template())
+    )
@@ -37,6 +37,8 @@ class WaitDuration(Action):
 
 
 class DoNothing(Action):
+    name = "DO_NOTHING"
+
     def do(self, agent: SimAgent, state: State):
         return agent.do_nothing()
 
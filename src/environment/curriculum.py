@@ -0,0 +1,45 @@
+"""
+Episode-length curriculum: train on short encounters while the policy is
+still close to random and move on to longer ones once DPS stops improving.
+"""
+
+
+class DurationCurriculum:
+    """
+    Steps through `durations` (in seconds). `update` is fed the mean DPS of
+    recent episodes and returns the new duration when it advances a stage,
+    which happens after `patience` updates without an improvement of more
+    than `min_improvement` (relative) over the best DPS of the current stage.
+    """
+
+    def __init__(self, durations, patience=3, min_improvement=0.01):
+        assert len(durations) > 0, "a curriculum needs at least one duration"
+        self.durations = list(durations)
+        self.stage = 0
+        self._patience = patience
+        self._min_improvement = min_improvement
+        self._best_dps = None
+        self._updates_without_improvement = 0
+
+    @property
+    def duration(self):
+        return self.durations[self.stage]
+
+    @property
+    def finished(self):
+        return self.stage == len(self.durations) - 1
+
+    def update(self, dps):
+        if self._best_dps is None or dps > self._best_dps * (1 + self._min_improvement):
+            self._best_dps = dps
+            self._updates_without_improvement = 0
+            return None
+
+        self._updates_without_improvement += 1
+        if self.finished or self._updates_without_improvement < self._patience:
+            return None
+
+        self.stage += 1
+        self._best_dps = None
+        self._updates_without_improvement = 0
+        return self.duration
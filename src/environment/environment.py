@@ -1,13 +1,17 @@
 import gym
+import hashlib
 import numpy as np
 import math
 import os
-from rich import print
+from collections import deque
 
-from agent.sim_agent import SimAgent
+from agent.sim_agent import DEFAULT_ENDPOINT, SimAgent
 from agent.sim_config import create_config
 from environment.actions import ACTION_SPACE, Action
 from environment.state import State
+from environment.trace import EpisodeTrace
+from logger.metrics import NullMetricsSink
+from logger.timing import TIMING, snapshot, timed
 
 NORMALIZATION_CONFIG = "normalization_config.json"
 
@@ -19,12 +23,19 @@ class WoWSimsEnv(gym.Env):
         sim_step_duration_msec,
         reward_type: str = "final_dps",
         verbose=False,
+        sim_endpoint: str = DEFAULT_ENDPOINT,
+        trace=False,
+        metrics_sink=None,
+        max_episode_steps=None,
+        action_mask_info=False,
+        time_remaining_observation=False,
     ):
         super(WoWSimsEnv, self).__init__()
         self.action_space = gym.spaces.Discrete(len(ACTION_SPACE))
-        self.observation_space = State.get_observation_space()
+        self.observation_space = State.get_observation_space(time_remaining_observation)
 
         self._verbose = verbose
+        self._metrics_sink = metrics_sink or NullMetricsSink()
 
         # set up reward type
         self.calculate_reward = None
@@ -48,59 +59,95 @@ class WoWSimsEnv(gym.Env):
         )
 
         self._sim_duration_seconds = sim_duration_seconds
+        self._sim_step_duration_msec = sim_step_duration_msec
+        self._reward_type = reward_type
+        self._max_episode_steps = max_episode_steps
+        # the next state's legal actions, only needed by the DQN replay buffer
+        self._action_mask_info = action_mask_info
+        # changes the observation layout, so only for episodes of varying length
+        self._time_remaining_observation = time_remaining_observation
 
         # initialize mutable state
         self.state = None
         self._steps = 0
-        self._commands = ""
+        self._truncated = False
+        self._seed_queue = deque()
         self._last_state = None
         self._last_action = None
         self._best_damage = 0
         self._total_reward = 0
+        # always recorded for the "New best" output, `trace` additionally
+        # keeps the best and worst episodes for export
+        self._trace = EpisodeTrace(
+            math.ceil(sim_duration_seconds * 1000 / sim_step_duration_msec)
+        )
+        self._keep_traces = trace
+        self._best_trace = None
+        self._worst_trace = None
         self._sim_agent = SimAgent(
-            port="/tmp/sim-agent.sock", step_duration_msec=sim_step_duration_msec
+            endpoint=sim_endpoint, step_duration_msec=sim_step_duration_msec
         )
 
-    def step(self, action):
-        assert self.action_space.contains(action), "%r invalid" % action
+    def step(self, action_index):
+        assert self.action_space.contains(action_index), "%r invalid" % action_index
 
         self._steps += 1
-        action: Action = ACTION_SPACE[action]
+        action: Action = ACTION_SPACE[action_index]
         assert action.can_do(self.state), "attempted illegal action %r" % action
         action.do(self._sim_agent, self.state)
 
         new_state = self._sim_agent.get_state()
-        self.state = State(new_state)
+        self.state = State(new_state, self._duration_msec())
         reward = self.calculate_reward()
         self._total_reward += reward
 
-        if hasattr(action, "spell"):
-            self._commands += action.spell + " " + str(math.floor(reward)) + " >"
+        self._trace.record(action_index, self.state.time_elapsed, reward)
 
-        done = self.state.is_done
+        # cut the episode short without telling the learner it terminated,
+        # so it bootstraps from the value of the last observation
+        self._truncated = (
+            not self.state.is_done
+            and self._max_episode_steps is not None
+            and self._steps >= self._max_episode_steps
+        )
+        done = self.state.is_done or self._truncated
         obs = self._get_obs()
         self._last_state = self.state
 
         if self.state.is_done:
-            print(
-                self.state.dps,
-                self.state.ability_dps,
-                self.state.melee_dps,
-                self.state.disease_dps,
+            self._metrics_sink.emit(
+                "episode",
+                dps=self.state.dps,
+                ability_dps=self.state.ability_dps,
+                melee_dps=self.state.melee_dps,
+                disease_dps=self.state.disease_dps,
             )
+            self._finish_trace()
+            if TIMING:
+                self._metrics_sink.emit("timings", histograms=snapshot())
 
         if self.state.is_done and self._best_damage < self.state.damage:
             self._best_damage = self.state.damage
-            print("New best found:")
-            print(self._commands)
-            print("total = ", self._best_damage)
-            print("dps = ", self.state.dps)
-            print(
-                "---------------------------------------------------------------------"
+            self._metrics_sink.emit(
+                "best",
+                damage=self._best_damage,
+                dps=self.state.dps,
+                trace=str(self._trace),
             )
-            print(" ")
         return obs, reward, done, self.get_metadata()
 
+    def _finish_trace(self):
+        self._trace.finish(self.state.damage, self.state.dps)
+        if not self._keep_traces:
+            return
+        if self._best_trace is None or self._best_trace.damage < self._trace.damage:
+            self._best_trace = self._trace.copy()
+        if self._worst_trace is None or self._worst_trace.damage > self._trace.damage:
+            self._worst_trace = self._trace.copy()
+
+    def get_traces(self):
+        return [self._best_trace, self._worst_trace]
+
     def _get_active_diseases(self, disease_state):
         diseases = disease_state.values()
         return [
@@ -114,8 +161,6 @@ class WoWSimsEnv(gym.Env):
             return 0
 
         if self.state.is_done:
-            if self._verbose:
-                print(self._commands)
             return self.state.ability_dps
 
         # rp
@@ -138,17 +183,13 @@ class WoWSimsEnv(gym.Env):
 
         if self._verbose:
             if self._steps % 100 == 0:
-                print(
-                    "Total: ",
-                    reward,
-                    "RP reward: ",
-                    rp_reward,
-                    "dis reward: ",
-                    disease_delta_reward,
-                    "num dis reward: ",
-                    num_disease_reward,
-                    "damage reward: ",
-                    damage_reward,
+                self._metrics_sink.emit(
+                    "reward",
+                    total=reward,
+                    rp=rp_reward,
+                    disease_delta=disease_delta_reward,
+                    num_diseases=num_disease_reward,
+                    damage=damage_reward,
                 )
         return reward
 
@@ -179,23 +220,67 @@ class WoWSimsEnv(gym.Env):
         return self.state.damage
 
     def get_metadata(self):
-        return {
+        metadata = {
             "dps": self.state.dps,
             "is_success": self.state.is_done,
             "steps": self._steps,
+            "TimeLimit.truncated": self._truncated,
+            "ability_dps": self.state.ability_dps,
+            "melee_dps": self.state.melee_dps,
+            "disease_dps": self.state.disease_dps,
         }
+        if self._action_mask_info:
+            metadata["action_mask"] = self.action_masks()
+        return metadata
+
+    def set_episode_duration(self, sim_duration_seconds):
+        """Takes effect from the next reset"""
+        self._sim_duration_seconds = sim_duration_seconds
+
+    def set_max_episode_steps(self, max_episode_steps):
+        """None lets episodes run until the sim is done"""
+        self._max_episode_steps = max_episode_steps
+
+    def get_settings(self):
+        """Everything besides the policy and the seed that decides an episode"""
+        sim_config = create_config(duration=self._sim_duration_seconds)
+        return dict(
+            sim_config=hashlib.sha256(sim_config).hexdigest(),
+            sim_step_duration_msec=self._sim_step_duration_msec,
+            reward_type=self._reward_type,
+            max_episode_steps=self._max_episode_steps,
+        )
+
+    def get_layout(self):
+        """The settings a policy trained on this env needs to act in it again"""
+        return dict(
+            time_remaining_observation=self._time_remaining_observation,
+            action_mask_info=self._action_mask_info,
+        )
+
+    def _duration_msec(self):
+        if not self._time_remaining_observation:
+            return None
+        return self._sim_duration_seconds * 1000
+
+    def queue_seeds(self, seeds):
+        """Seeds for the next resets, e.g. the auto resets of a VecEnv"""
+        self._seed_queue = deque(seeds)
 
     def reset(self, seed=None, options=None):
+        if seed is None and self._seed_queue:
+            seed = self._seed_queue.popleft()
         sim_config = create_config(
             random_seed=seed,
             duration=self._sim_duration_seconds,
         )
         state = self._sim_agent.reset(sim_config)
-        self.state = State(state)
+        self.state = State(state, self._duration_msec())
         self._last_state = None
         self._steps = 0
-        self._commands = ""
+        self._truncated = False
         self._total_reward = 0
+        self._trace.clear()
 
         return self._get_obs()
 
@@ -210,6 +295,7 @@ class WoWSimsEnv(gym.Env):
             [i for i, mask in enumerate(self.action_masks()) if mask]
         )
 
+    @timed("action_masks")
     def action_masks(self):
         return np.array([action.can_do(self.state) for action in ACTION_SPACE])
 
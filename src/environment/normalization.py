@@ -1,34 +1,134 @@
+import gym
 import numpy as np
 from gym.wrappers import normalize
+from stable_baselines3.common.vec_env import VecEnvWrapper
+
+from logger.timing import timed
 
 
 class NormalizeObservation(normalize.NormalizeObservation):
-    def __init__(
-        self,
-        env,
-        epsilon=1e-8,
-        scaling="minmax"
-    ):
+    def __init__(self, env, epsilon=1e-8, scaling="minmax"):
         super().__init__(env, epsilon)
 
         self.num_envs = getattr(env, "num_envs", 1)
         self.is_vector_env = getattr(env, "is_vector_env", False)
         if self.is_vector_env:
-            self.obs_rms = RunningMeanStdMinMax(shape=self.single_observation_space.shape)
+            self.obs_rms = RunningMeanStdMinMax(
+                shape=self.single_observation_space.shape
+            )
         else:
             self.obs_rms = RunningMeanStdMinMax(shape=self.observation_space.shape)
         self.epsilon = epsilon
-        self.scale_fn = {"standard": self._scale_standard, "minmax": self._scale_minmax}[scaling]
+        assert scaling in ("standard", "minmax"), "%s is not a valid scaling" % scaling
+        self.scaling = scaling
 
+    @timed("NormalizeObservation.normalize")
     def normalize(self, obs):
         self.obs_rms.update(obs)
-        return self.scale_fn(obs)
+        return scale_observations(obs, self.obs_rms, self.scaling, self.epsilon)
+
+    def set_obs_rms(self, obs_rms):
+        self.obs_rms = obs_rms
+
+    def normalization_constants(self):
+        return normalization_constants(self.obs_rms, self.scaling, self.epsilon)
+
+
+class VecNormalizeObservation(VecEnvWrapper):
+    """
+    Normalizes the observations of all workers of a VecEnv with one set of
+    statistics, updated once per step on the whole (n_envs, obs_dim) batch.
+    Set `training` to False to freeze the statistics, e.g. for evaluation.
+    """
+
+    def __init__(self, venv, epsilon=1e-8, scaling="minmax", training=True):
+        super().__init__(venv)
+        self.obs_rms = RunningMeanStdMinMax(shape=self.observation_space.shape)
+        self.epsilon = epsilon
+        assert scaling in ("standard", "minmax"), "%s is not a valid scaling" % scaling
+        self.scaling = scaling
+        self.training = training
+
+    def reset(self):
+        return self.normalize(self.venv.reset())
+
+    def step_wait(self):
+        obs, rewards, dones, infos = self.venv.step_wait()
+        obs = self.normalize(obs)
+        for info in infos:
+            if "terminal_observation" in info:
+                info["terminal_observation"] = scale_observations(
+                    info["terminal_observation"],
+                    self.obs_rms,
+                    self.scaling,
+                    self.epsilon,
+                )
+        return obs, rewards, dones, infos
+
+    @timed("VecNormalizeObservation.normalize")
+    def normalize(self, obs):
+        if self.training:
+            self.obs_rms.update(obs)
+        return scale_observations(obs, self.obs_rms, self.scaling, self.epsilon)
+
+    def set_obs_rms(self, obs_rms):
+        self.obs_rms = obs_rms
+
+    @property
+    def normalization(self):
+        return self.scaling
+
+    def normalization_constants(self):
+        return normalization_constants(self.obs_rms, self.scaling, self.epsilon)
+
+
+class VecStaticNormalizeObservation(VecEnvWrapper):
+    """
+    Normalizes with constant scale and offset vectors and keeps no running
+    statistics. By default the declared bounds of the observation space are
+    mapped to [0, 1]; set_obs_rms calibrates to the min / max of recorded
+    observations instead (see fit_obs_rms).
+    """
 
-    def _scale_standard(self, obs):
-        return (obs - self.obs_rms.mean) / np.sqrt(self.obs_rms.var + self.epsilon)
+    def __init__(self, venv):
+        super().__init__(venv)
+        self.training = False
+        self.set_obs_rms(None)
 
-    def _scale_minmax(self, obs):
-        return (obs - self.obs_rms.min) / (self.obs_rms.max - self.obs_rms.min + self.epsilon)
+    def reset(self):
+        return self.normalize(self.venv.reset())
+
+    def step_wait(self):
+        obs, rewards, dones, infos = self.venv.step_wait()
+        obs = self.normalize(obs)
+        for info in infos:
+            if "terminal_observation" in info:
+                info["terminal_observation"] = self.normalize(
+                    info["terminal_observation"]
+                )
+        return obs, rewards, dones, infos
+
+    @timed("VecStaticNormalizeObservation.normalize")
+    def normalize(self, obs):
+        normalized = np.multiply(obs, self._scale, dtype=np.float32)
+        normalized += self._offset
+        return normalized
+
+    def set_obs_rms(self, obs_rms):
+        self.obs_rms = obs_rms
+        if obs_rms is None:
+            scale, offset = bounds_constants(self.observation_space)
+        else:
+            scale, offset = normalization_constants(obs_rms, "minmax")
+        self._scale = scale.astype(np.float32)
+        self._offset = offset.astype(np.float32)
+
+    @property
+    def normalization(self):
+        return "static"
+
+    def normalization_constants(self):
+        return self._scale, self._offset
 
 
 class RunningMeanStdMinMax(normalize.RunningMeanStd):
@@ -37,9 +137,54 @@ class RunningMeanStdMinMax(normalize.RunningMeanStd):
         self.min = np.zeros(shape)
         self.max = np.zeros(shape)
 
-    def update_from_moments(self, batch_mean, batch_var, batch_count):
-        self.mean, self.var, self.count = normalize.update_mean_var_count_from_moments(
-            self.mean, self.var, self.count, batch_mean, batch_var, batch_count
-        )
-        self.min = np.minimum(self.min, batch_var)
-        self.max = np.maximum(self.max, batch_var)
+    def update(self, x):
+        super().update(x)
+        self.min = np.minimum(self.min, np.min(x, axis=0))
+        self.max = np.maximum(self.max, np.max(x, axis=0))
+
+
+def scale_observations(obs, obs_rms, scaling="minmax", epsilon=1e-8):
+    if scaling == "standard":
+        return (obs - obs_rms.mean) / np.sqrt(obs_rms.var + epsilon)
+    if scaling == "minmax":
+        return (obs - obs_rms.min) / (obs_rms.max - obs_rms.min + epsilon)
+    raise ValueError("%s is not a valid scaling" % scaling)
+
+
+def normalization_constants(obs_rms, scaling="minmax", epsilon=1e-8):
+    """
+    Freeze the current statistics into `(scale, offset)` vectors such that
+    `obs * scale + offset` equals scale_observations(obs, obs_rms, scaling)
+    """
+    if scaling == "standard":
+        scale = 1 / np.sqrt(obs_rms.var + epsilon)
+        return scale, -obs_rms.mean * scale
+    if scaling == "minmax":
+        scale = 1 / (obs_rms.max - obs_rms.min + epsilon)
+        return scale, -obs_rms.min * scale
+    raise ValueError("%s is not a valid scaling" % scaling)
+
+
+def bounds_constants(observation_space, epsilon=1e-8):
+    """
+    `(scale, offset)` mapping the declared bounds of `observation_space` to
+    [0, 1]. Discrete and MultiBinary parts are one-hot / binary once flattened.
+    """
+    space = gym.spaces.flatten_space(observation_space)
+    low = space.low.astype(np.float64)
+    high = space.high.astype(np.float64)
+    scale = 1 / np.maximum(high - low, epsilon)
+    return scale, -low * scale
+
+
+def fit_obs_rms(dataset):
+    """Compute observation statistics over a recorded TrajectoryDataset"""
+    obs_rms = None
+    for _, _, columns in dataset.chunks():
+        observations = columns["observations"]
+        if not len(observations):
+            continue
+        if obs_rms is None:
+            obs_rms = RunningMeanStdMinMax(shape=observations.shape[1:])
+        obs_rms.update(np.asarray(observations, dtype=np.float64))
+    return obs_rms
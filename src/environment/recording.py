@@ -0,0 +1,223 @@
+import os
+import socket
+import uuid
+
+import gym
+import numpy as np
+import orjson
+
+# name -> (dtype, whether the column has a per-step feature dimension)
+COLUMNS = {
+    "observations": (np.float32, True),
+    "actions": (np.uint8, False),
+    "action_masks": (np.bool_, True),
+    "rewards": (np.float32, False),
+    "dones": (np.bool_, False),
+    "dps": (np.float32, False),
+}
+
+META_FILE = "meta.json"
+EPISODES_FILE = "episodes.jsonl"
+
+
+class TrajectoryRecorder(gym.Wrapper):
+    """
+    Streams every transition of the wrapped env to disk.
+
+    Each recorder writes to its own `worker-<host>-<pid>-<run id>` directory,
+    so any number of SubprocVecEnv workers, and later runs reusing a pid, can
+    record into the same `output_dir`.
+    Columns are written into fixed size chunks of memory-mapped `.npy` files,
+    and every finished episode is appended to `episodes.jsonl`. Wrap the env
+    before normalization so the raw observations are stored.
+    """
+
+    def __init__(self, env, output_dir, chunk_size=2**16):
+        super().__init__(env)
+        self._output_dir = output_dir
+        self._chunk_size = chunk_size
+        self._writer = None
+        self._last_obs = None
+        self._last_action_mask = None
+        self._episode_start = 0
+        self._episode_return = 0
+
+    def reset(self, **kwargs):
+        obs = self.env.reset(**kwargs)
+        if self._writer is None:
+            self._writer = _ChunkWriter(
+                os.path.join(
+                    self._output_dir,
+                    f"worker-{socket.gethostname()}-{os.getpid()}-"
+                    f"{uuid.uuid4().hex[:12]}",
+                ),
+                self._chunk_size,
+                {
+                    "observations": np.shape(obs),
+                    "action_masks": (self.action_space.n,),
+                },
+            )
+        self._last_obs = obs
+        self._last_action_mask = self.env.action_masks()
+        self._episode_start = self._writer.num_steps
+        self._episode_return = 0
+        return obs
+
+    def step(self, action):
+        obs, reward, done, info = self.env.step(action)
+        self._writer.append(
+            observations=self._last_obs,
+            actions=action,
+            action_masks=self._last_action_mask,
+            rewards=reward,
+            dones=done,
+            dps=info["dps"],
+        )
+        self._episode_return += reward
+        if done:
+            self._writer.add_episode(
+                start=self._episode_start,
+                length=self._writer.num_steps - self._episode_start,
+                dps=info["dps"],
+                total_reward=self._episode_return,
+            )
+        self._last_obs = obs
+        self._last_action_mask = self.env.action_masks()
+        return obs, reward, done, info
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        return self.env.close()
+
+
+class _ChunkWriter:
+    def __init__(self, directory, chunk_size, feature_shapes):
+        # never mix steps into what another recorder wrote
+        os.makedirs(directory)
+        self._directory = directory
+        self._chunk_size = chunk_size
+        self._feature_shapes = feature_shapes
+        self._chunk_index = -1
+        self._columns = None
+        self._position = 0
+        self.num_steps = 0
+
+        with open(os.path.join(directory, META_FILE), "wb") as f:
+            f.write(
+                orjson.dumps(
+                    {
+                        "chunk_size": chunk_size,
+                        "feature_shapes": feature_shapes,
+                    }
+                )
+            )
+        self._episodes = open(os.path.join(directory, EPISODES_FILE), "ab")
+
+    def append(self, **values):
+        if self._columns is None or self._position == self._chunk_size:
+            self._open_next_chunk()
+        for name, value in values.items():
+            self._columns[name][self._position] = value
+        self._position += 1
+        self.num_steps += 1
+
+    def add_episode(self, **episode):
+        self._episodes.write(orjson.dumps(episode) + b"\n")
+        self._episodes.flush()
+
+    def close(self):
+        self._finish_chunk()
+        self._episodes.close()
+
+    def _chunk_directory(self, index):
+        return os.path.join(self._directory, "chunk-%05d" % index)
+
+    def _open_next_chunk(self):
+        self._finish_chunk()
+        self._chunk_index += 1
+        directory = self._chunk_directory(self._chunk_index)
+        os.makedirs(directory, exist_ok=True)
+        self._columns = {
+            name: np.lib.format.open_memmap(
+                os.path.join(directory, f"{name}.npy"),
+                mode="w+",
+                dtype=dtype,
+                shape=(self._chunk_size,)
+                + (tuple(self._feature_shapes[name]) if has_features else ()),
+            )
+            for name, (dtype, has_features) in COLUMNS.items()
+        }
+        self._position = 0
+
+    def _finish_chunk(self):
+        if self._columns is None:
+            return
+        for column in self._columns.values():
+            column.flush()
+        # readers only trust chunks that have a meta file
+        with open(
+            os.path.join(self._chunk_directory(self._chunk_index), META_FILE), "wb"
+        ) as f:
+            f.write(orjson.dumps({"length": self._position}))
+        self._columns = None
+
+
+class TrajectoryDataset:
+    """Read-only view over everything a TrajectoryRecorder wrote to `root`"""
+
+    def __init__(self, root):
+        self._workers = sorted(
+            os.path.join(root, name)
+            for name in os.listdir(root)
+            if os.path.exists(os.path.join(root, name, META_FILE))
+        )
+
+    def chunks(self):
+        """Yield (worker directory, first step, columns) for each finished chunk"""
+        for worker in self._workers:
+            with open(os.path.join(worker, META_FILE), "rb") as f:
+                chunk_size = orjson.loads(f.read())["chunk_size"]
+            for index, name in enumerate(
+                sorted(d for d in os.listdir(worker) if d.startswith("chunk-"))
+            ):
+                directory = os.path.join(worker, name)
+                if not os.path.exists(os.path.join(directory, META_FILE)):
+                    continue
+                with open(os.path.join(directory, META_FILE), "rb") as f:
+                    length = orjson.loads(f.read())["length"]
+                yield worker, index * chunk_size, {
+                    column: np.load(
+                        os.path.join(directory, f"{column}.npy"), mmap_mode="r"
+                    )[:length]
+                    for column in COLUMNS
+                }
+
+    def episodes(self):
+        for worker in self._workers:
+            path = os.path.join(worker, EPISODES_FILE)
+            if not os.path.exists(path):
+                continue
+            with open(path, "rb") as f:
+                for line in f:
+                    yield dict(orjson.loads(line), worker=worker)
+
+    @property
+    def num_steps(self):
+        return sum(len(columns["actions"]) for _, _, columns in self.chunks())
+
+    def iter_batches(self, batch_size, columns=tuple(COLUMNS), shuffle=True):
+        """
+        Stream batches chunk by chunk, so only one chunk is paged in at a time.
+        With `shuffle` the chunk order and the rows within a chunk are shuffled.
+        """
+        chunks = list(self.chunks())
+        if shuffle:
+            np.random.shuffle(chunks)
+        for _, _, chunk in chunks:
+            length = len(chunk["actions"])
+            order = np.random.permutation(length) if shuffle else np.arange(length)
+            for start in range(0, length, batch_size):
+                rows = np.sort(order[start : start + batch_size])
+                yield {column: np.asarray(chunk[column][rows]) for column in columns}
@@ -4,13 +4,17 @@ import numpy as np
 from gym.spaces import Dict, Discrete, Box, MultiBinary
 
 from .constants import BUFFS, DEBUFFS, SPELLS, RUNE_TYPE_MAP
+from logger.timing import timed
 
 SPELL_SET = set(SPELLS)
 
 
 class State:
-    def __init__(self, raw_state):
+    @timed("State.__init__")
+    def __init__(self, raw_state, duration_msec=None):
+        """With `duration_msec`, observations include the time remaining"""
         self._raw_state = raw_state
+        self._duration_msec = duration_msec
         self._abilities_map = {
             ability["name"]: ability
             for ability in self._raw_state["abilities"]
@@ -65,14 +69,19 @@ class State:
     def time_elapsed(self):
         return self._raw_state["currentTime"]
 
+    @property
+    def time_remaining(self):
+        return max(0, (self._duration_msec or 0) - self.time_elapsed)
+
     def can_cast(self, spell):
         return self._abilities_map[spell]["canCast"]
 
+    @timed("State.get_observations")
     def get_observations(self):
         return self._get_observations()
 
     def _get_observations(self):
-        return {
+        observations = {
             # Discrete
             "isExecute35": int(self._raw_state["isExecute35"]),
             "runeTypes": [RUNE_TYPE_MAP[rt] for rt in self._raw_state["runeTypes"]],
@@ -93,37 +102,41 @@ class State:
             "runeGraces": self._raw_state["runeGraces"],
             "runicPower": self.runic_power,
         }
+        if self._duration_msec is not None:
+            observations["timeRemaining"] = self.time_remaining
+        return observations
 
     @staticmethod
-    def get_observation_space():
+    def get_observation_space(time_remaining=False):
         # If we minmax scaled, then low could be 0, high 1, but not sure it matters
-        return Dict(
-            {
-                # Discrete
-                "isExecute35": Discrete(2),
-                "runeTypes": Box(low=0, high=3, shape=(6,), dtype=np.uint8),
-                "debuffsActive": MultiBinary(len(DEBUFFS)),
-                "buffsActive": MultiBinary(len(BUFFS)),
-                "gcdAvailable": Discrete(2),
-                # Continuous
-                "abilityCDs": Box(
-                    low=0, high=1000 * 60 * 10, shape=(len(SPELLS),), dtype=np.uint32
-                ),
-                "abilityGCDs": Box(
-                    low=0, high=1500, shape=(len(SPELLS),), dtype=np.uint16
-                ),
-                "debuffDurations": Box(
-                    low=0, high=1000 * 60 * 10, shape=(len(DEBUFFS),), dtype=np.uint32
-                ),
-                "buffDurations": Box(
-                    low=0, high=1000 * 60 * 10, shape=(len(BUFFS),), dtype=np.uint32
-                ),
-                "gcdRemaining": Box(low=0, high=1500, shape=(1,), dtype=np.uint16),
-                "runeCDs": Box(low=0, high=1000 * 10, shape=(6,), dtype=np.uint16),
-                "runeGraces": Box(low=0, high=2500, shape=(6,), dtype=np.uint16),
-                "runicPower": Box(low=0, high=130, shape=(1,), dtype=np.uint16),
-            }
-        )
+        spaces = {
+            # Discrete
+            "isExecute35": Discrete(2),
+            "runeTypes": Box(low=0, high=3, shape=(6,), dtype=np.uint8),
+            "debuffsActive": MultiBinary(len(DEBUFFS)),
+            "buffsActive": MultiBinary(len(BUFFS)),
+            "gcdAvailable": Discrete(2),
+            # Continuous
+            "abilityCDs": Box(
+                low=0, high=1000 * 60 * 10, shape=(len(SPELLS),), dtype=np.uint32
+            ),
+            "abilityGCDs": Box(low=0, high=1500, shape=(len(SPELLS),), dtype=np.uint16),
+            "debuffDurations": Box(
+                low=0, high=1000 * 60 * 10, shape=(len(DEBUFFS),), dtype=np.uint32
+            ),
+            "buffDurations": Box(
+                low=0, high=1000 * 60 * 10, shape=(len(BUFFS),), dtype=np.uint32
+            ),
+            "gcdRemaining": Box(low=0, high=1500, shape=(1,), dtype=np.uint16),
+            "runeCDs": Box(low=0, high=1000 * 10, shape=(6,), dtype=np.uint16),
+            "runeGraces": Box(low=0, high=2500, shape=(6,), dtype=np.uint16),
+            "runicPower": Box(low=0, high=130, shape=(1,), dtype=np.uint16),
+        }
+        if time_remaining:
+            spaces["timeRemaining"] = Box(
+                low=0, high=1000 * 60 * 10, shape=(1,), dtype=np.uint32
+            )
+        return Dict(spaces)
 
     @property
     def abilities(self):
@@ -0,0 +1,94 @@
+import math
+
+import numpy as np
+import orjson
+
+from environment.actions import ACTION_SPACE, CastAction
+
+
+class EpisodeTrace:
+    """
+    Preallocated record of the actions taken during an episode.
+
+    Columns are NumPy arrays indexed by step, so recording an action is a few
+    scalar stores instead of string concatenation.
+    """
+
+    def __init__(self, capacity):
+        self.action_indices = np.zeros(capacity, dtype=np.uint8)
+        self.timestamps = np.zeros(capacity, dtype=np.float32)
+        self.rewards = np.zeros(capacity, dtype=np.float32)
+        self.length = 0
+        self.damage = 0
+        self.dps = 0
+
+    def record(self, action_index, timestamp, reward):
+        if self.length == len(self.action_indices):
+            self._grow()
+        self.action_indices[self.length] = action_index
+        self.timestamps[self.length] = timestamp
+        self.rewards[self.length] = reward
+        self.length += 1
+
+    def finish(self, damage, dps):
+        self.damage = damage
+        self.dps = dps
+
+    def clear(self):
+        self.length = 0
+        self.damage = 0
+        self.dps = 0
+
+    def copy(self):
+        trace = EpisodeTrace(self.length)
+        trace.action_indices[:] = self.action_indices[: self.length]
+        trace.timestamps[:] = self.timestamps[: self.length]
+        trace.rewards[:] = self.rewards[: self.length]
+        trace.length = self.length
+        trace.finish(self.damage, self.dps)
+        return trace
+
+    def _grow(self):
+        capacity = max(1, 2 * len(self.action_indices))
+        self.action_indices = np.resize(self.action_indices, capacity)
+        self.timestamps = np.resize(self.timestamps, capacity)
+        self.rewards = np.resize(self.rewards, capacity)
+
+    def to_dict(self):
+        return {
+            "damage": self.damage,
+            "dps": self.dps,
+            "actions": [
+                ACTION_SPACE[i].name for i in self.action_indices[: self.length]
+            ],
+            "timestamps": self.timestamps[: self.length],
+            "rewards": self.rewards[: self.length],
+        }
+
+    def __str__(self):
+        # same shape as the old command log: "<spell> <reward> >" per cast
+        return "".join(
+            "%s %d >" % (ACTION_SPACE[i].spell, math.floor(reward))
+            for i, reward in zip(
+                self.action_indices[: self.length], self.rewards[: self.length]
+            )
+            if isinstance(ACTION_SPACE[i], CastAction)
+        )
+
+
+def export_traces(path, traces):
+    """Write the best and worst of the given episode traces to a JSON file"""
+    traces = [trace for trace in traces if trace is not None]
+    if not traces:
+        return None
+
+    best = max(traces, key=lambda trace: trace.damage)
+    worst = min(traces, key=lambda trace: trace.damage)
+    with open(path, "wb") as f:
+        f.write(
+            orjson.dumps(
+                {"best": best.to_dict(), "worst": worst.to_dict()},
+                option=orjson.OPT_SERIALIZE_NUMPY,
+            )
+        )
+    return path
@@ -0,0 +1,173 @@
+import multiprocessing
+import queue
+import threading
+import uuid
+
+from rich import print
+
+from logger.timing import format_summary, merge_snapshot, snapshot
+
+# queues by sink token, inherited by forked children, so an unpickled copy of a
+# sink in any process of the run can find its queue again
+_QUEUES = {}
+
+
+class MetricsSink:
+    """
+    Channel that env workers push small episode records into.
+
+    Records are dropped instead of blocking when the queue is full, so a slow
+    consumer can never stall an environment step. Create it before the workers
+    are forked so they inherit the queue.
+    """
+
+    def __init__(self, maxsize=10000):
+        self._queue = multiprocessing.get_context("fork").Queue(maxsize)
+        self._token = uuid.uuid4().hex
+        _QUEUES[self._token] = self._queue
+
+    def emit(self, kind, **record):
+        try:
+            self._queue.put_nowait((kind, record))
+        except queue.Full:
+            pass
+
+    def drain(self):
+        records = []
+        while True:
+            try:
+                records.append(self._queue.get_nowait())
+            except queue.Empty:
+                return records
+
+    # pickle support: the queue itself can only be passed to child processes
+    # while they are spawned, copies sent over a pipe (e.g. with a bound env
+    # method) look it up by token instead
+    def __getstate__(self):
+        if multiprocessing.context.get_spawning_popen() is None:
+            return self._token, None
+        return self._token, self._queue
+
+    def __setstate__(self, state):
+        self._token, self._queue = state
+        if self._queue is None:
+            if self._token not in _QUEUES:
+                raise RuntimeError(
+                    "MetricsSink copies only work in the process that created "
+                    "the sink or its forked children"
+                )
+            self._queue = _QUEUES[self._token]
+
+
+class NullMetricsSink:
+    def emit(self, kind, **record):
+        pass
+
+
+class MetricsConsumer(threading.Thread):
+    """Aggregates records from a MetricsSink and renders them at a fixed rate"""
+
+    def __init__(self, sink: MetricsSink, interval_seconds=10.0):
+        super().__init__(name="metrics-consumer", daemon=True)
+        self._sink = sink
+        self._interval_seconds = interval_seconds
+        self._stopped = threading.Event()
+        self._handlers = {
+            "episode": self._on_episode,
+            "best": self._on_best,
+            "reward": self._on_reward,
+            "timings": self._on_timings,
+        }
+        self._best_damage = 0
+        self._histograms = {}
+        self._reset_window()
+
+    def _reset_window(self):
+        self._episodes = []
+        self._rewards = []
+        self._best = None
+        self._new_timings = False
+
+    def run(self):
+        while not self._stopped.wait(self._interval_seconds):
+            self.flush()
+
+    def stop(self):
+        self._stopped.set()
+        self.join()
+        self.flush()
+
+    def flush(self):
+        for kind, record in self._sink.drain():
+            handler = self._handlers.get(kind)
+            if handler is not None:
+                handler(record)
+        self._render()
+        self._reset_window()
+
+    def _on_episode(self, record):
+        self._episodes.append(record)
+
+    def _on_best(self, record):
+        if record["damage"] > self._best_damage:
+            self._best_damage = record["damage"]
+            self._best = record
+
+    def _on_reward(self, record):
+        self._rewards.append(record)
+
+    def _on_timings(self, record):
+        merge_snapshot(self._histograms, record["histograms"])
+        self._new_timings = True
+
+    def _render(self):
+        if self._episodes:
+            count = len(self._episodes)
+            print(
+                "Episodes:",
+                count,
+                "DPS mean:",
+                round(_mean(self._episodes, "dps"), 1),
+                "max:",
+                round(max(episode["dps"] for episode in self._episodes), 1),
+                "ability:",
+                round(_mean(self._episodes, "ability_dps"), 1),
+                "melee:",
+                round(_mean(self._episodes, "melee_dps"), 1),
+                "disease:",
+                round(_mean(self._episodes, "disease_dps"), 1),
+            )
+
+        if self._rewards:
+            print(
+                "Total: ",
+                _mean(self._rewards, "total"),
+                "RP reward: ",
+                _mean(self._rewards, "rp"),
+                "dis reward: ",
+                _mean(self._rewards, "disease_delta"),
+                "num dis reward: ",
+                _mean(self._rewards, "num_diseases"),
+                "damage reward: ",
+                _mean(self._rewards, "damage"),
+            )
+
+        if self._new_timings:
+            # fold in what the learner process itself recorded, e.g. inference
+            merge_snapshot(self._histograms, snapshot())
+            print(format_summary(self._histograms))
+
+        if self._best is not None:
+            print("New best found:")
+            if self._best["trace"] is not None:
+                print(self._best["trace"])
+            print("total = ", self._best["damage"])
+            print("dps = ", self._best["dps"])
+            print(
+                "---------------------------------------------------------------------"
+            )
+            print(" ")
+
+
+def _mean(records, key):
+    return sum(record[key] for record in records) / len(records)
@@ -0,0 +1,130 @@
+import os
+import time
+from functools import wraps
+
+TIMING = bool(int(os.environ.get("TIMING", 0)))
+
+# bucket i counts durations of [2^(i-1), 2^i) nanoseconds, the last one is open
+NUM_BUCKETS = 40
+
+
+class Histogram:
+    """Fixed-bucket (powers of two) latency histogram in nanoseconds"""
+
+    __slots__ = ("counts", "total_ns")
+
+    def __init__(self, counts=None, total_ns=0):
+        self.counts = counts if counts is not None else [0] * NUM_BUCKETS
+        self.total_ns = total_ns
+
+    def record(self, duration_ns):
+        self.counts[min(duration_ns.bit_length(), NUM_BUCKETS - 1)] += 1
+        self.total_ns += duration_ns
+
+    def merge(self, other):
+        for i, count in enumerate(other.counts):
+            self.counts[i] += count
+        self.total_ns += other.total_ns
+
+    def take(self):
+        """Return the recorded data as a new histogram and reset this one"""
+        counts, self.counts = self.counts, [0] * NUM_BUCKETS
+        total_ns, self.total_ns = self.total_ns, 0
+        return Histogram(counts, total_ns)
+
+    @property
+    def count(self):
+        return sum(self.counts)
+
+    def percentile(self, q):
+        """Upper bound in nanoseconds of the bucket holding the q-th percentile"""
+        threshold = q / 100 * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if count and seen >= threshold:
+                return 2**i
+        return 0
+
+    def __getstate__(self):
+        return self.counts, self.total_ns
+
+    def __setstate__(self, state):
+        self.counts, self.total_ns = state
+
+
+_histograms = {}
+
+
+def get_histogram(name):
+    if name not in _histograms:
+        _histograms[name] = Histogram()
+    return _histograms[name]
+
+
+def timed(name):
+    """
+    Record the duration of every call into the histogram called `name`.
+
+    Does nothing unless TIMING=1 is set before the module is imported, so the
+    disabled hot path runs the undecorated function.
+    """
+
+    def decorator(fn):
+        if not TIMING:
+            return fn
+
+        histogram = get_histogram(name)
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter_ns()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                histogram.record(time.perf_counter_ns() - start)
+
+        return wrapper
+
+    return decorator
+
+
+def snapshot():
+    """Take and reset everything recorded in this process since the last call"""
+    return {
+        name: histogram.take()
+        for name, histogram in list(_histograms.items())
+        if histogram.count
+    }
+
+
+def merge_snapshot(histograms, other):
+    for name, histogram in other.items():
+        if name not in histograms:
+            histograms[name] = Histogram()
+        histograms[name].merge(histogram)
+    return histograms
+
+
+def format_summary(histograms):
+    lines = [
+        "%-32s %10s %10s %10s %10s %10s %10s"
+        % ("timer", "count", "mean us", "p50 us", "p90 us", "p99 us", "total s")
+    ]
+    for name, histogram in sorted(
+        histograms.items(), key=lambda item: -item[1].total_ns
+    ):
+        count = histogram.count
+        lines.append(
+            "%-32s %10d %10.1f %10.1f %10.1f %10.1f %10.2f"
+            % (
+                name,
+                count,
+                histogram.total_ns / count / 1e3,
+                histogram.percentile(50) / 1e3,
+                histogram.percentile(90) / 1e3,
+                histogram.percentile(99) / 1e3,
+                histogram.total_ns / 1e9,
+            )
+        )
+    return "\n".join(lines)
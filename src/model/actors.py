@@ -0,0 +1,318 @@
+import multiprocessing
+import queue
+import threading
+import time
+
+import numpy as np
+
+
+"""
+Actor design for rollouts: every actor process runs its own env loop and asks
+a central inference server in the learner for actions. The server batches
+whatever requests arrive within a short window, so a slow env never holds up
+the others and the policy network always works on a batch.
+"""
+
+
+def policy_predict_fn(policy, deterministic=False):
+    """
+    Adapt a policy whose predict accepts `action_masks` (the MaskablePPO
+    policy or a CompiledPolicy) to the server's batch interface.
+    """
+
+    def predict(observations, action_masks):
+        actions, _ = policy.predict(
+            observations, deterministic=deterministic, action_masks=action_masks
+        )
+        return (actions,)
+
+    return predict
+
+
+class InferenceServer(threading.Thread):
+    """
+    Answers action requests from actors in batches.
+
+    `predict_fn(observations, action_masks)` gets the stacked batch and returns
+    a tuple of batch-first arrays; row i of each goes back to the i-th actor.
+    """
+
+    def __init__(
+        self,
+        predict_fn,
+        request_queue,
+        reply_connections,
+        batch_window_seconds=0.002,
+        max_batch_size=None,
+    ):
+        super().__init__(name="inference-server", daemon=True)
+        self._predict_fn = predict_fn
+        self._request_queue = request_queue
+        self._reply_connections = reply_connections
+        self._batch_window_seconds = batch_window_seconds
+        self._max_batch_size = max_batch_size or len(reply_connections)
+        self._stopped = threading.Event()
+        self.error = None
+        self.num_requests = 0
+        self.num_batches = 0
+
+    def run(self):
+        try:
+            self._serve()
+        except Exception as e:
+            self.error = e
+            # every actor is or will be blocked on its reply, wake them all
+            for connection in self._reply_connections:
+                connection.send(RuntimeError(f"Inference server failed: {e!r}"))
+
+    def _serve(self):
+        while not self._stopped.is_set():
+            batch = self._next_batch()
+            if not batch:
+                continue
+            actor_ids, observations, action_masks = zip(*batch)
+            outputs = self._predict_fn(np.stack(observations), np.stack(action_masks))
+            for row, actor_id in enumerate(actor_ids):
+                self._reply_connections[actor_id].send(
+                    tuple(output[row] for output in outputs)
+                )
+            self.num_requests += len(batch)
+            self.num_batches += 1
+
+    def _next_batch(self):
+        try:
+            batch = [self._request_queue.get(timeout=0.1)]
+        except queue.Empty:
+            return []
+
+        deadline = time.perf_counter() + self._batch_window_seconds
+        while len(batch) < self._max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._request_queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def stop(self):
+        self._stopped.set()
+        self.join()
+
+
+def _run_actor(
+    actor_id,
+    env_fn,
+    request_queue,
+    reply_connection,
+    results,
+    segments,
+    segment_length,
+    stopped,
+):
+    env = env_fn()
+    try:
+        obs = env.reset()
+        episode_return = 0
+        segment = []
+        while not stopped.is_set():
+            action_mask = env.action_masks()
+            request_queue.put((actor_id, obs, action_mask))
+            reply = reply_connection.recv()
+            if isinstance(reply, Exception):
+                raise reply
+            next_obs, reward, done, info = env.step(reply[0])
+            episode_return += reward
+            # a time-limit cut, the learner bootstraps from the last observation
+            truncated = done and info.get("TimeLimit.truncated", False)
+            terminal_obs = next_obs if truncated else np.zeros_like(next_obs)
+            if done:
+                results.put(
+                    dict(
+                        actor_id=actor_id,
+                        dps=info["dps"],
+                        steps=info["steps"],
+                        total_reward=episode_return,
+                    )
+                )
+                next_obs = env.reset()
+                episode_return = 0
+
+            if segment_length is not None:
+                segment.append(
+                    (obs, action_mask, reward, done, truncated, terminal_obs)
+                    + tuple(reply)
+                )
+                if len(segment) == segment_length:
+                    segments.put(_pack_segment(segment, next_obs))
+                    segment = []
+            obs = next_obs
+    finally:
+        env.close()
+        # the pool is shutting down, don't wait for the learner to drain the
+        # queues
+        request_queue.cancel_join_thread()
+        results.cancel_join_thread()
+        segments.cancel_join_thread()
+
+
+def _pack_segment(segment, bootstrap_observation):
+    columns = [np.stack(column) for column in zip(*segment)]
+    (
+        observations,
+        action_masks,
+        rewards,
+        dones,
+        truncated,
+        terminal_observations,
+        actions,
+    ) = columns[:7]
+    return dict(
+        observations=observations,
+        action_masks=action_masks,
+        rewards=rewards,
+        # also set for time-limit cuts, which are marked in `truncated` and
+        # come with the observation they were cut at
+        dones=dones,
+        truncated=truncated,
+        terminal_observations=terminal_observations,
+        actions=actions,
+        # whatever else the server replied with, e.g. log-probs and versions
+        extras=columns[7:],
+        bootstrap_observation=bootstrap_observation,
+    )
+
+
+class ActorPool:
+    """
+    Runs one actor process per env factory against an InferenceServer living
+    in this process. Finished episodes are reported through `episodes()`.
+
+    With `segment_length`, actors also ship every `segment_length` consecutive
+    transitions as one segment, read with `segment()`.
+    """
+
+    def __init__(
+        self,
+        env_fns,
+        predict_fn,
+        batch_window_seconds=0.002,
+        segment_length=None,
+        max_queued_segments=64,
+    ):
+        # actors are forked so they inherit queues and env factories directly
+        context = multiprocessing.get_context("fork")
+        self._request_queue = context.Queue()
+        self._results = context.Queue()
+        # bounded, so actors slow down when the learner falls behind
+        self._segments = context.Queue(max_queued_segments)
+        self._stopped = context.Event()
+
+        pipes = [context.Pipe(duplex=False) for _ in env_fns]
+        self._server = InferenceServer(
+            predict_fn,
+            self._request_queue,
+            [send for _, send in pipes],
+            batch_window_seconds=batch_window_seconds,
+        )
+        self._actors = [
+            context.Process(
+                target=_run_actor,
+                args=(
+                    actor_id,
+                    env_fn,
+                    self._request_queue,
+                    receive,
+                    self._results,
+                    self._segments,
+                    segment_length,
+                    self._stopped,
+                ),
+                daemon=True,
+            )
+            for actor_id, (env_fn, (receive, _)) in enumerate(zip(env_fns, pipes))
+        ]
+
+    def start(self):
+        # fork before this process runs any thread of its own
+        for actor in self._actors:
+            actor.start()
+        self._server.start()
+        return self
+
+    def _get(self, source, timeout=None):
+        """
+        Like source.get(timeout), but stops the pool and raises once the
+        inference server failed or an actor died instead of waiting forever
+        """
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        while True:
+            if self._server.error is not None:
+                self.stop()
+                raise RuntimeError("Inference server failed") from self._server.error
+            dead = [
+                actor_id
+                for actor_id, actor in enumerate(self._actors)
+                if not actor.is_alive()
+            ]
+            if dead:
+                exitcode = self._actors[dead[0]].exitcode
+                self.stop()
+                raise RuntimeError(
+                    f"Actor {dead[0]} died with exit code {exitcode}, "
+                    f"{len(dead)} of {len(self._actors)} actors are gone"
+                )
+            wait = 0.1
+            if deadline is not None:
+                wait = min(wait, deadline - time.perf_counter())
+                if wait <= 0:
+                    raise queue.Empty
+            try:
+                return source.get(timeout=wait)
+            except queue.Empty:
+                pass
+
+    def results(self, timeout=None):
+        """Block for the next record an actor put into the results queue"""
+        return self._get(self._results, timeout)
+
+    def episodes(self, count, timeout=None):
+        return [self.results(timeout) for _ in range(count)]
+
+    def drain_results(self):
+        records = []
+        while True:
+            try:
+                records.append(self._results.get_nowait())
+            except queue.Empty:
+                return records
+
+    def segment(self, timeout=None):
+        return self._get(self._segments, timeout)
+
+    @property
+    def mean_batch_size(self):
+        if not self._server.num_batches:
+            return 0
+        return self._server.num_requests / self._server.num_batches
+
+    def stop(self, timeout_seconds=10):
+        self._stopped.set()
+        deadline = time.perf_counter() + timeout_seconds
+        # keep serving requests and make room in the segment queue until every
+        # actor noticed the stop and closed its env
+        for actor in self._actors:
+            while actor.is_alive() and time.perf_counter() < deadline:
+                self._drain_segments()
+                actor.join(timeout=0.1)
+            if actor.is_alive():
+                actor.terminate()
+        self._server.stop()
+
+    def _drain_segments(self):
+        try:
+            while True:
+                self._segments.get_nowait()
+        except queue.Empty:
+            pass
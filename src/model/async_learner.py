@@ -0,0 +1,282 @@
+import copy
+import queue
+import threading
+import time
+from collections import deque
+
+import numpy as np
+import torch as th
+from stable_baselines3.common.utils import configure_logger
+
+from model.actors import ActorPool
+
+
+"""
+Asynchronous actor-learner training for MaskablePPO (IMPALA style).
+
+Actors keep collecting with a slightly stale copy of the policy while the
+learner updates; every sample is tagged with the policy version it was drawn
+from and the learner corrects for the lag with V-trace importance weights.
+"""
+
+
+def vtrace(
+    behaviour_log_probs,
+    target_log_probs,
+    rewards,
+    dones,
+    values,
+    bootstrap_values,
+    gamma,
+    rho_clip=1.0,
+    c_clip=1.0,
+):
+    """
+    V-trace targets and policy gradient advantages for (batch, time) tensors.
+    `dones[:, t]` marks that the episode ended with the transition at t. For
+    episodes cut off by a time limit, `rewards[:, t]` must already include the
+    discounted value of the state they were cut at.
+    """
+    ratios = th.exp(target_log_probs - behaviour_log_probs)
+    rhos = th.clamp(ratios, max=rho_clip)
+    cs = th.clamp(ratios, max=c_clip)
+    not_dones = 1.0 - dones
+
+    next_values = th.cat([values[:, 1:], bootstrap_values[:, None]], dim=1)
+    deltas = rhos * (rewards + gamma * not_dones * next_values - values)
+
+    corrections = th.zeros_like(values)
+    correction = th.zeros_like(bootstrap_values)
+    for t in reversed(range(values.shape[1])):
+        correction = deltas[:, t] + gamma * cs[:, t] * not_dones[:, t] * correction
+        corrections[:, t] = correction
+    vs = values + corrections
+
+    next_vs = th.cat([vs[:, 1:], bootstrap_values[:, None]], dim=1)
+    advantages = rhos * (rewards + gamma * not_dones * next_vs - values)
+    return vs, advantages
+
+
+class AsyncLearner:
+    """
+    Trains a MaskablePPO model from segments collected by an ActorPool.
+
+    The inference server acts with its own copy of the policy, refreshed after
+    every update, so the learner never waits for rollouts to stop. Training
+    fails if no segment arrives for `segment_timeout_seconds`.
+
+    Actors send raw observations. `normalizer`, a VecNormalizeObservation or
+    VecStaticNormalizeObservation, normalizes (and while training, updates
+    its statistics with) every inference batch, and normalizes segments with
+    its current constants at training time, so its statistics are the ones to
+    evaluate, export and checkpoint with.
+    """
+
+    def __init__(
+        self,
+        model,
+        env_fns,
+        normalizer,
+        segment_length=64,
+        segments_per_update=16,
+        rho_clip=1.0,
+        c_clip=1.0,
+        batch_window_seconds=0.002,
+        segment_timeout_seconds=300,
+    ):
+        self.model = model
+        self.version = 0
+        self._segments_per_update = segments_per_update
+        self._rho_clip = rho_clip
+        self._c_clip = c_clip
+        self._segment_timeout_seconds = segment_timeout_seconds
+        self._normalizer = normalizer
+        self._normalizer_lock = threading.Lock()
+        self._actor_policy = copy.deepcopy(model.policy).eval()
+        self._actor_policy_lock = threading.Lock()
+        self._pool = ActorPool(
+            env_fns,
+            self._predict,
+            batch_window_seconds=batch_window_seconds,
+            segment_length=segment_length,
+        )
+
+    def _predict(self, observations, action_masks):
+        with self._normalizer_lock:
+            observations = self._normalizer.normalize(observations)
+        with self._actor_policy_lock, th.no_grad():
+            policy = self._actor_policy
+            observations, _ = policy.obs_to_tensor(observations)
+            distribution = policy.get_distribution(
+                observations, action_masks=action_masks
+            )
+            actions = distribution.get_actions(deterministic=False)
+            log_probs = distribution.log_prob(actions)
+            version = self.version
+        return (
+            actions.cpu().numpy(),
+            log_probs.cpu().numpy(),
+            np.full(len(actions), version),
+        )
+
+    def _publish(self):
+        state_dict = self.model.policy.state_dict()
+        with self._actor_policy_lock:
+            self._actor_policy.load_state_dict(state_dict)
+            self.version += 1
+
+    def learn(self, total_timesteps, callback=None, log_interval=10):
+        """
+        `callback` is called once per update. There are no rollouts, so
+        callbacks that read rollout locals such as `dones` or `infos` (e.g.
+        CurriculumCallback) don't work here.
+        """
+        model = self.model
+        if not model._custom_logger:
+            model.set_logger(configure_logger(model.verbose, None, "async", True))
+        if model.ep_info_buffer is None:
+            model.ep_info_buffer = deque(maxlen=100)
+
+        start_time = time.time()
+        start_timesteps = model.num_timesteps
+        callback = model._init_callback(callback)
+        callback.on_training_start(locals(), globals())
+        self._pool.start()
+        try:
+            while model.num_timesteps - start_timesteps < total_timesteps:
+                model._current_progress_remaining = 1.0 - (
+                    model.num_timesteps - start_timesteps
+                ) / float(total_timesteps)
+                segments = [
+                    self._next_segment() for _ in range(self._segments_per_update)
+                ]
+                self._train(segments)
+                self._publish()
+                model.num_timesteps += sum(len(s["actions"]) for s in segments)
+                model._n_updates += 1
+
+                for episode in self._pool.drain_results():
+                    model.ep_info_buffer.append(
+                        {"r": episode["total_reward"], "l": episode["steps"]}
+                    )
+                    model.logger.record_mean("rollout/dps", episode["dps"])
+                if log_interval and model._n_updates % log_interval == 0:
+                    self._dump_logs(start_time, start_timesteps)
+                callback.update_locals(locals())
+                if not callback.on_step():
+                    break
+        finally:
+            self._pool.stop()
+            callback.on_training_end()
+        return model
+
+    def _next_segment(self):
+        try:
+            return self._pool.segment(timeout=self._segment_timeout_seconds)
+        except queue.Empty:
+            raise RuntimeError(
+                f"No segment from the actors in {self._segment_timeout_seconds} "
+                "seconds"
+            )
+
+    def _train(self, segments):
+        model = self.model
+        policy = model.policy
+        policy.set_training_mode(True)
+        model._update_learning_rate(policy.optimizer)
+
+        batch_size, segment_length = len(segments), len(segments[0]["actions"])
+        with self._normalizer_lock:
+            scale, offset = self._normalizer.normalization_constants()
+
+        def stack(key, dtype=th.float32):
+            return th.as_tensor(
+                np.stack([s[key] for s in segments]), dtype=dtype, device=policy.device
+            )
+
+        def normalized(key):
+            return th.as_tensor(
+                np.stack([s[key] for s in segments]) * scale + offset,
+                dtype=th.float32,
+                device=policy.device,
+            )
+
+        observations = normalized("observations").flatten(0, 1)
+        actions = stack("actions", th.long).flatten(0, 1)
+        action_masks = stack("action_masks", th.bool).flatten(0, 1)
+        rewards = stack("rewards")
+        dones = stack("dones")
+        truncated = stack("truncated", th.bool)
+        behaviour_log_probs = th.as_tensor(
+            np.stack([s["extras"][0] for s in segments]), device=policy.device
+        )
+        versions = np.stack([s["extras"][1] for s in segments])
+        bootstrap_observations = normalized("bootstrap_observation")
+
+        values, log_probs, entropy = policy.evaluate_actions(
+            observations, actions, action_masks=action_masks
+        )
+        values = values.reshape(batch_size, segment_length)
+        log_probs = log_probs.reshape(batch_size, segment_length)
+        with th.no_grad():
+            bootstrap_values = policy.predict_values(bootstrap_observations).flatten()
+            # time-limit cuts aren't terminal, bootstrap from where they were
+            # cut off like the on-policy rollout buffer does
+            if truncated.any():
+                terminal_observations = normalized("terminal_observations")
+                rewards[truncated] += (
+                    model.gamma
+                    * policy.predict_values(terminal_observations[truncated]).flatten()
+                )
+            vs, advantages = vtrace(
+                behaviour_log_probs,
+                log_probs.detach(),
+                rewards,
+                dones,
+                values.detach(),
+                bootstrap_values,
+                model.gamma,
+                self._rho_clip,
+                self._c_clip,
+            )
+
+        policy_loss = -(advantages * log_probs).mean()
+        value_loss = th.nn.functional.mse_loss(values, vs)
+        entropy_loss = -th.mean(entropy)
+        loss = policy_loss + model.vf_coef * value_loss + model.ent_coef * entropy_loss
+
+        policy.optimizer.zero_grad()
+        loss.backward()
+        th.nn.utils.clip_grad_norm_(policy.parameters(), model.max_grad_norm)
+        policy.optimizer.step()
+        policy.set_training_mode(False)
+
+        model.logger.record_mean("train/policy_loss", policy_loss.item())
+        model.logger.record_mean("train/value_loss", value_loss.item())
+        model.logger.record_mean("train/entropy_loss", entropy_loss.item())
+        model.logger.record_mean(
+            "train/importance_weight",
+            th.exp(log_probs.detach() - behaviour_log_probs).mean().item(),
+        )
+        model.logger.record_mean(
+            "train/policy_lag", float(np.mean(self.version - versions))
+        )
+
+    def _dump_logs(self, start_time, start_timesteps):
+        model = self.model
+        fps = int(
+            (model.num_timesteps - start_timesteps) / (time.time() - start_time + 1e-8)
+        )
+        if model.ep_info_buffer:
+            model.logger.record(
+                "rollout/ep_rew_mean",
+                np.mean([info["r"] for info in model.ep_info_buffer]),
+            )
+            model.logger.record(
+                "rollout/ep_len_mean",
+                np.mean([info["l"] for info in model.ep_info_buffer]),
+            )
+        model.logger.record("time/fps", fps)
+        model.logger.record("time/policy_version", self.version)
+        model.logger.record("train/n_updates", model._n_updates)
+        model.logger.dump(step=model.num_timesteps)
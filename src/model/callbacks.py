@@ -1,13 +1,126 @@
+import copy
+
 from stable_baselines3.common import callbacks
 
+from model.checkpoints import capture_resume_state
+from model.evaluation import evaluate_seeds
+
+
+class CurriculumCallback(callbacks.BaseCallback):
+    """
+    Feeds the mean DPS of the episodes finished during each rollout to a
+    DurationCurriculum and pushes its episode duration to the env workers.
+    """
+
+    def __init__(self, curriculum, verbose=0):
+        super().__init__(verbose)
+        self._curriculum = curriculum
+        self._episode_dps = []
+
+    def _on_training_start(self) -> None:
+        self.training_env.env_method("set_episode_duration", self._curriculum.duration)
+
+    def _on_step(self) -> bool:
+        for done, info in zip(self.locals["dones"], self.locals["infos"]):
+            if done and info["is_success"]:
+                self._episode_dps.append(info["dps"])
+        return True
+
+    def _on_rollout_end(self) -> None:
+        if not self._episode_dps:
+            return
+        duration = self._curriculum.update(
+            sum(self._episode_dps) / len(self._episode_dps)
+        )
+        self._episode_dps = []
+        if duration is not None:
+            self.training_env.env_method("set_episode_duration", duration)
+            if self.verbose:
+                print(f"Curriculum: episode duration is now {duration} seconds")
+        self.logger.record("curriculum/episode_duration", self._curriculum.duration)
+
 
-class CheckpointCallback(callbacks.CheckpointCallback):
-    def __init__(self, exclude, **kwargs):
+class EvalCallback(callbacks.BaseCallback):
+    """
+    Every `eval_freq` calls, evaluates on `seeds` in `eval_env` with the
+    current normalizer statistics of the training env. Improvements of more
+    than `min_improvement` (relative) are saved through `checkpoint_manager`,
+    which keeps the best one as best.zip. Training stops after `patience`
+    evaluations without improvement, unless `patience` is None.
+    """
+
+    def __init__(
+        self,
+        eval_env,
+        seeds,
+        eval_freq,
+        checkpoint_manager,
+        patience=None,
+        min_improvement=0.0,
+        exclude=None,
+        cache=None,
+        verbose=0,
+    ):
+        super().__init__(verbose)
+        self._eval_env = eval_env
+        self._seeds = seeds
+        self.eval_freq = eval_freq
+        self._checkpoint_manager = checkpoint_manager
+        self._patience = patience
+        self._min_improvement = min_improvement
         self._exclude = exclude
-        super().__init__(**kwargs)
+        self._cache = cache
+        self.best_dps = None
+        self.plateaued = False
+        self._evaluations_without_improvement = 0
 
     def _on_step(self) -> bool:
-        if self.n_calls % self.save_freq == 0:
-            model_path = self._checkpoint_path(extension="zip")
-            self.model.save(model_path, exclude=self._exclude)
+        if self.n_calls % self.eval_freq != 0:
+            return True
+
+        self._eval_env.set_obs_rms(copy.deepcopy(self.training_env.obs_rms))
+        self._eval_env.training = False
+        dps = evaluate_seeds(self.model, self._eval_env, self._seeds, self._cache).get(
+            "mean", 0.0
+        )
+        self.logger.record("eval/mean_dps", dps)
+
+        if self.best_dps is None or dps > self.best_dps * (1 + self._min_improvement):
+            self.best_dps = dps
+            self._evaluations_without_improvement = 0
+            model_path = self._checkpoint_manager.save(
+                self.model,
+                exclude=self._exclude,
+                dps=dps,
+                resume_state=capture_resume_state(self.training_env),
+            )
+            if self.verbose:
+                print(f"Evaluation: new best {dps:.1f} DPS, saving to {model_path}")
+            return True
+
+        self._evaluations_without_improvement += 1
+        if self.verbose:
+            print(
+                f"Evaluation: {dps:.1f} DPS, best {self.best_dps:.1f} "
+                f"({self._evaluations_without_improvement} without improvement)"
+            )
+        if (
+            self._patience is not None
+            and self._evaluations_without_improvement >= self._patience
+        ):
+            if self.verbose:
+                print("Evaluation: no improvement, stopping training")
+            self.plateaued = True
+            return False
         return True
+
+
+class StopCallback(callbacks.BaseCallback):
+    """Ends training at the next step once `stop_request` is requested"""
+
+    def __init__(self, stop_request, verbose=0):
+        super().__init__(verbose)
+        self._stop_request = stop_request
+
+    def _on_step(self) -> bool:
+        return not self._stop_request.requested
@@ -0,0 +1,242 @@
+import io
+import json
+import os
+import pickle
+import queue
+import random
+import re
+import threading
+import time
+import traceback
+import zipfile
+
+import numpy as np
+import torch as th
+
+
+"""
+Checkpoints of a model live in one directory next to an index.json listing
+them. Saving only serializes the model into memory on the caller's thread; a
+background writer compresses it and moves it into place with an atomic rename,
+then prunes checkpoints the retention policy no longer keeps.
+"""
+
+INDEX_FILE = "index.json"
+# a copy of the checkpoint with the best evaluation DPS
+BEST_FILE = "best.zip"
+# stable-baselines3 only reads the .pth entries and `data` of the archive
+RESUME_STATE_FILE = "resume_state.pkl"
+
+
+def _write_atomically(path, write):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        write(f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def read_index(directory):
+    path = os.path.join(directory, INDEX_FILE)
+    if os.path.exists(path):
+        with open(path) as f:
+            return json.load(f)
+
+    # directories written before the index existed only hold <n>.zip files,
+    # they are listed but never pruned since no manager wrote them
+    filenames = os.listdir(directory) if os.path.isdir(directory) else []
+    indices = sorted(
+        int(match.group(1))
+        for match in map(re.compile(r"^(\d+)\.zip$").match, filenames)
+        if match
+    )
+    return {
+        "next_index": indices[-1] + 1 if indices else 0,
+        "best": None,
+        "checkpoints": [
+            dict(
+                index=index,
+                file=f"{index}.zip",
+                timesteps=None,
+                time=None,
+                dps=None,
+                legacy=True,
+            )
+            for index in indices
+        ],
+    }
+
+
+def latest_checkpoint(directory):
+    checkpoints = read_index(directory)["checkpoints"]
+    if not checkpoints:
+        return None
+    return os.path.join(directory, checkpoints[-1]["file"])
+
+
+def best_checkpoint(directory):
+    index = read_index(directory)
+    for checkpoint in index["checkpoints"]:
+        if checkpoint["index"] == index["best"]:
+            return os.path.join(directory, checkpoint["file"])
+    return None
+
+
+def load_resume_state(path):
+    with zipfile.ZipFile(path) as archive:
+        if RESUME_STATE_FILE not in archive.namelist():
+            return None
+        return pickle.loads(archive.read(RESUME_STATE_FILE))
+
+
+def capture_resume_state(env):
+    """
+    What a checkpoint needs besides the model to continue training exactly:
+    the env layout, the normalizer mode and statistics and the learner's RNG
+    states.
+    """
+    return dict(
+        layout=env.env_method("get_layout", indices=0)[0],
+        normalization=env.normalization,
+        obs_rms=env.obs_rms,
+        python_rng_state=random.getstate(),
+        numpy_rng_state=np.random.get_state(),
+        torch_rng_state=th.get_rng_state(),
+    )
+
+
+def restore_normalization(env, resume_state):
+    """Load the checkpoint's normalizer statistics into an env of the same mode"""
+    # checkpoints from before the mode was saved: only static ones lack stats
+    normalization = resume_state.get(
+        "normalization", "static" if resume_state["obs_rms"] is None else None
+    )
+    if normalization is not None and normalization != env.normalization:
+        raise ValueError(
+            "The checkpoint was trained with NORMALIZATION=%s, not %s"
+            % (normalization, env.normalization)
+        )
+    env.set_obs_rms(resume_state["obs_rms"])
+
+
+def restore_resume_state(env, resume_state):
+    restore_normalization(env, resume_state)
+    random.setstate(resume_state["python_rng_state"])
+    np.random.set_state(resume_state["numpy_rng_state"])
+    th.set_rng_state(resume_state["torch_rng_state"])
+
+
+class CheckpointManager:
+    """
+    Keeps the last `keep_last` checkpoints plus the one with the best model
+    selection DPS, which is also copied to best.zip. Checkpoints from before
+    the index existed are kept. `max_pending` bounds how many serialized
+    checkpoints may wait for the writer before `save` blocks.
+    """
+
+    def __init__(self, directory, keep_last=5, max_pending=2):
+        assert keep_last >= 1, "%s is not a valid keep_last" % keep_last
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._keep_last = keep_last
+        self._index = read_index(directory)
+        self._lock = threading.Lock()
+        self._pending = queue.Queue(max_pending)
+        self._writer = threading.Thread(
+            target=self._write_loop, name="checkpoint-writer", daemon=True
+        )
+        self._writer.start()
+
+    def save(self, model, exclude=None, dps=None, test_dps=None, resume_state=None):
+        """
+        Returns the path the checkpoint will be written to. `dps` is the model
+        selection score that decides the best checkpoint, so it must always
+        come from the same evaluation seeds; `test_dps` is only recorded.
+        `resume_state` is stored alongside the model, see load_resume_state.
+        """
+        # an uncompressed archive in memory, the writer compresses it
+        buffer = io.BytesIO()
+        model.save(buffer, exclude=exclude)
+        if resume_state is not None:
+            with zipfile.ZipFile(buffer, "a") as archive:
+                archive.writestr(RESUME_STATE_FILE, pickle.dumps(resume_state))
+        with self._lock:
+            index = self._index["next_index"]
+            self._index["next_index"] += 1
+        checkpoint = dict(
+            index=index,
+            file=f"{index}.zip",
+            timesteps=model.num_timesteps,
+            time=time.time(),
+            dps=dps,
+            test_dps=test_dps,
+        )
+        self._pending.put((checkpoint, buffer.getvalue()))
+        return os.path.join(self.directory, checkpoint["file"])
+
+    def latest(self):
+        return latest_checkpoint(self.directory)
+
+    def best(self):
+        return best_checkpoint(self.directory)
+
+    def flush(self):
+        self._pending.join()
+
+    def close(self):
+        self.flush()
+        self._pending.put(None)
+        self._writer.join()
+
+    def _write_loop(self):
+        while True:
+            item = self._pending.get()
+            try:
+                if item is None:
+                    return
+                self._write(*item)
+            except Exception:
+                traceback.print_exc()
+            finally:
+                self._pending.task_done()
+
+    def _write(self, checkpoint, data):
+        def compress(f):
+            with zipfile.ZipFile(io.BytesIO(data)) as source, zipfile.ZipFile(
+                f, "w", compression=zipfile.ZIP_DEFLATED
+            ) as target:
+                for info in source.infolist():
+                    target.writestr(info.filename, source.read(info))
+
+        _write_atomically(os.path.join(self.directory, checkpoint["file"]), compress)
+        with self._lock:
+            self._index["checkpoints"].append(checkpoint)
+            removed = self._apply_retention()
+            is_best = self._index["best"] == checkpoint["index"]
+            index_data = json.dumps(self._index, indent=2).encode()
+        if is_best:
+            _write_atomically(os.path.join(self.directory, BEST_FILE), compress)
+        _write_atomically(
+            os.path.join(self.directory, INDEX_FILE), lambda f: f.write(index_data)
+        )
+        # only delete files once the index no longer refers to them
+        for old in removed:
+            try:
+                os.remove(os.path.join(self.directory, old["file"]))
+            except FileNotFoundError:
+                pass
+
+    def _apply_retention(self):
+        checkpoints = self._index["checkpoints"]
+        evaluated = [c for c in checkpoints if c["dps"] is not None]
+        best = max(evaluated, key=lambda c: c["dps"]) if evaluated else None
+        self._index["best"] = best["index"] if best is not None else None
+
+        managed = [c for c in checkpoints if not c.get("legacy")]
+        keep = {c["index"] for c in checkpoints if c.get("legacy")}
+        keep.update(c["index"] for c in managed[-self._keep_last :])
+        if best is not None:
+            keep.add(best["index"])
+        self._index["checkpoints"] = [c for c in checkpoints if c["index"] in keep]
+        return [c for c in checkpoints if c["index"] not in keep]
@@ -0,0 +1,107 @@
+import os
+import sys
+
+import gym
+
+from agent.sim_agent import DEFAULT_ENDPOINT
+from environment.state import State
+from model.checkpoints import load_resume_state, restore_normalization
+from model.dqn import MaskedDQN
+from model.evaluation import (
+    EvaluationCache,
+    evaluate_seeds,
+    format_evaluation,
+    write_evaluation,
+)
+from model.learn import EVALUATION_CACHE, initialize_environment, parse_endpoints
+from model.ppo import MaskablePPO
+
+
+"""
+Compare checkpoints on the same evaluation seeds:
+
+    MODEL_TYPE=PPO python src/model/compare.py models/MaskablePPO/*.zip
+
+Episodes already in the evaluation cache are not simulated again, so adding a
+checkpoint to a comparison only costs the evaluation of that checkpoint. Each
+checkpoint is evaluated in an env with the layout it was trained with.
+"""
+
+MODEL_CLASSES = dict(PPO=MaskablePPO, DQN=MaskedDQN)
+
+
+def checkpoint_layout(model, resume_state, model_type):
+    """The env layout `model` was trained with, see WoWSimsEnv.get_layout"""
+    if resume_state is not None and "layout" in resume_state:
+        return resume_state["layout"]
+    # checkpoints from before the layout was saved
+    return dict(
+        time_remaining_observation=model.observation_space.shape[0]
+        != gym.spaces.flatdim(State.get_observation_space()),
+        action_mask_info=model_type == "DQN",
+    )
+
+
+def evaluate_checkpoint(path, model, resume_state, env, seeds, cache):
+    if resume_state is not None:
+        restore_normalization(env, resume_state)
+    else:
+        print(f"{path} has no normalizer state, using the current statistics")
+    env.training = False
+    return evaluate_seeds(model, env, seeds, cache)
+
+
+def compare(paths):
+    model_type = os.environ.get("MODEL_TYPE", "PPO")
+    assert model_type in MODEL_CLASSES, "%s is not a valid model type" % model_type
+    environment_count = int(os.environ.get("ENVIRONMENT_COUNT", 16))
+    env_kwargs = dict(
+        sim_duration_seconds=int(os.environ.get("EPISODE_DURATION_SECONDS", 60)),
+        sim_step_duration_msec=int(os.environ.get("SIMULATION_STEP_DURATION_MSEC", 50)),
+        reward_type=os.environ.get("REWARD_TYPE", "delta_damage"),
+    )
+    endpoints = parse_endpoints(os.environ.get("SIM_ENDPOINT", DEFAULT_ENDPOINT))
+    normalization = os.environ.get("NORMALIZATION", "minmax")
+    seeds = list(range(int(os.environ.get("EVAL_EPISODES", 20))))
+    cache = EvaluationCache(
+        EVALUATION_CACHE, int(os.environ.get("EVAL_CACHE_SIZE", 100000))
+    )
+    output = os.environ.get("EVALUATION_FILE", "./evaluations/compare.json")
+
+    env = env_layout = None
+    results = {}
+    try:
+        for path in paths:
+            model = MODEL_CLASSES[model_type].load(path)
+            resume_state = load_resume_state(path)
+            layout = checkpoint_layout(model, resume_state, model_type)
+            if layout != env_layout:
+                if env is not None:
+                    env.close()
+                env = initialize_environment(
+                    environment_count,
+                    dict(env_kwargs, **layout),
+                    endpoints,
+                    normalization,
+                )
+                env_layout = layout
+            results[path] = evaluate_checkpoint(
+                path, model, resume_state, env, seeds, cache
+            )
+            write_evaluation(output, path, results[path])
+            print(path)
+            print(format_evaluation(results[path]))
+    finally:
+        if env is not None:
+            env.close()
+
+    print("Ranking by mean DPS:")
+    for path, result in sorted(
+        results.items(), key=lambda item: item[1].get("mean", 0), reverse=True
+    ):
+        print(f"  {result.get('mean', 0):8.1f}  {path}")
+    return results
+
+
+if __name__ == "__main__":
+    compare(sys.argv[1:])
@@ -0,0 +1,46 @@
+import os
+import signal
+import threading
+import time
+
+
+"""
+Graceful stop requests for long running training: SIGTERM, SIGINT or creating
+a control file ask the learner to stop after the current step, so it can still
+evaluate, checkpoint and close its workers.
+"""
+
+
+class StopRequest:
+    """
+    Becomes `requested` after one of `signals` or once `stop_file` exists.
+    The file is removed when noticed so the next run doesn't stop right away,
+    and only looked for every `poll_seconds`.
+    """
+
+    def __init__(
+        self, stop_file=None, signals=(signal.SIGTERM, signal.SIGINT), poll_seconds=1.0
+    ):
+        self._stop_file = stop_file
+        self._poll_seconds = poll_seconds
+        self._next_poll = 0
+        self._event = threading.Event()
+        for signum in signals:
+            signal.signal(signum, self._handle_signal)
+
+    def _handle_signal(self, signum, frame):
+        print(f"Received {signal.Signals(signum).name}, stopping after this step")
+        self._event.set()
+
+    @property
+    def requested(self):
+        if self._event.is_set() or self._stop_file is None:
+            return self._event.is_set()
+        now = time.monotonic()
+        if now >= self._next_poll:
+            self._next_poll = now + self._poll_seconds
+            if os.path.exists(self._stop_file):
+                print(f"Found {self._stop_file}, stopping after this step")
+                os.remove(self._stop_file)
+                self._event.set()
+        return self._event.is_set()
@@ -1,12 +1,16 @@
-from typing import Union, Dict, Optional, Tuple
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple, Union
 
 import numpy as np
 import torch as th
 from gym import spaces
 from stable_baselines3 import DQN
+from stable_baselines3.common.buffers import ReplayBuffer
 from stable_baselines3.common.vec_env import VecEnv
 from stable_baselines3.dqn import MlpPolicy
 from stable_baselines3.dqn.policies import QNetwork
+from torch.nn import functional as F
+
+from logger.timing import timed
 
 
 """
@@ -33,13 +37,153 @@ class MaskedNetwork(QNetwork):
         return action
 
 
+class MaskedReplayBufferSamples(NamedTuple):
+    observations: th.Tensor
+    actions: th.Tensor
+    next_observations: th.Tensor
+    dones: th.Tensor
+    rewards: th.Tensor
+    next_action_masks: th.Tensor
+
+
+class MaskedReplayBuffer(ReplayBuffer):
+    """
+    Replay buffer that also stores which actions were legal in the next state,
+    packed into a bitmask, taken from the `action_mask` the env reports in info
+    when created with `action_mask_info=True`.
+    """
+
+    def __init__(self, buffer_size, observation_space, action_space, *args, **kwargs):
+        super().__init__(buffer_size, observation_space, action_space, *args, **kwargs)
+        self.next_action_masks = np.zeros(
+            (self.buffer_size, self.n_envs, (action_space.n + 7) // 8),
+            dtype=np.uint8,
+        )
+
+    def add(
+        self,
+        obs: np.ndarray,
+        next_obs: np.ndarray,
+        action: np.ndarray,
+        reward: np.ndarray,
+        done: np.ndarray,
+        infos: List[Dict[str, Any]],
+    ) -> None:
+        assert "action_mask" in infos[0], "create the env with action_mask_info=True"
+        # must happen before super().add() advances self.pos
+        self.next_action_masks[self.pos] = np.packbits(
+            np.array([info["action_mask"] for info in infos], dtype=bool), axis=-1
+        )
+        super().add(obs, next_obs, action, reward, done, infos)
+
+    def _get_samples(
+        self, batch_inds: np.ndarray, env=None
+    ) -> MaskedReplayBufferSamples:
+        # Sample randomly the env idx
+        env_indices = np.random.randint(0, high=self.n_envs, size=(len(batch_inds),))
+
+        if self.optimize_memory_usage:
+            next_obs = self._normalize_obs(
+                self.observations[(batch_inds + 1) % self.buffer_size, env_indices, :],
+                env,
+            )
+        else:
+            next_obs = self._normalize_obs(
+                self.next_observations[batch_inds, env_indices, :], env
+            )
+
+        next_action_masks = np.unpackbits(
+            self.next_action_masks[batch_inds, env_indices],
+            axis=-1,
+            count=self.action_space.n,
+        ).astype(bool)
+
+        data = (
+            self._normalize_obs(self.observations[batch_inds, env_indices, :], env),
+            self.actions[batch_inds, env_indices, :],
+            next_obs,
+            # Only use dones that are not due to timeouts
+            (
+                self.dones[batch_inds, env_indices]
+                * (1 - self.timeouts[batch_inds, env_indices])
+            ).reshape(-1, 1),
+            self._normalize_reward(
+                self.rewards[batch_inds, env_indices].reshape(-1, 1), env
+            ),
+        )
+        return MaskedReplayBufferSamples(
+            *tuple(map(self.to_torch, data)),
+            th.as_tensor(next_action_masks, device=self.device),
+        )
+
+
 class MaskedDQN(DQN):
+    # masks passed to predict, used instead of the ones of self.env
+    _action_masks_override = None
+
     def __init__(self, *args, **kwargs):
+        kwargs.setdefault("replay_buffer_class", MaskedReplayBuffer)
         super().__init__(
             *args, **kwargs, policy_kwargs={"action_masks": self.action_masks}
         )
 
+    def train(self, gradient_steps: int, batch_size: int = 100) -> None:
+        # Switch to train mode (this affects batch norm / dropout)
+        self.policy.set_training_mode(True)
+        # Update learning rate according to schedule
+        self._update_learning_rate(self.policy.optimizer)
+
+        losses = []
+        for _ in range(gradient_steps):
+            # Sample replay buffer
+            replay_data = self.replay_buffer.sample(
+                batch_size, env=self._vec_normalize_env
+            )
+
+            with th.no_grad():
+                # Compute the next Q-values using the target network
+                next_q_values = self.q_net_target(replay_data.next_observations)
+                # Follow greedy policy over the actions legal in the next state
+                next_q_values = next_q_values.masked_fill(
+                    ~replay_data.next_action_masks, -th.inf
+                )
+                next_q_values, _ = next_q_values.max(dim=1)
+                # Avoid potential broadcast issue
+                next_q_values = next_q_values.reshape(-1, 1)
+                # 1-step TD target
+                target_q_values = (
+                    replay_data.rewards
+                    + (1 - replay_data.dones) * self.gamma * next_q_values
+                )
+
+            # Get current Q-values estimates
+            current_q_values = self.q_net(replay_data.observations)
+
+            # Retrieve the q-values for the actions from the replay buffer
+            current_q_values = th.gather(
+                current_q_values, dim=1, index=replay_data.actions.long()
+            )
+
+            # Compute Huber loss (less sensitive to outliers)
+            loss = F.smooth_l1_loss(current_q_values, target_q_values)
+            losses.append(loss.item())
+
+            # Optimize the policy
+            self.policy.optimizer.zero_grad()
+            loss.backward()
+            # Clip gradient norm
+            th.nn.utils.clip_grad_norm_(self.policy.parameters(), self.max_grad_norm)
+            self.policy.optimizer.step()
+
+        # Increase update counter
+        self._n_updates += gradient_steps
+
+        self.logger.record("train/n_updates", self._n_updates, exclude="tensorboard")
+        self.logger.record("train/loss", np.mean(losses))
+
     def action_masks(self):
+        if self._action_masks_override is not None:
+            return self._action_masks_override
         if isinstance(self.env, VecEnv):
             return np.stack(self.env.env_method("action_masks"))
         else:
@@ -51,19 +195,31 @@ class MaskedDQN(DQN):
         else:
             return getattr(self.env, "sample_possible_actions")()
 
+    @timed("policy.predict")
     def predict(
         self,
         observation: Union[np.ndarray, Dict[str, np.ndarray]],
         state: Optional[Tuple[np.ndarray, ...]] = None,
         episode_start: Optional[np.ndarray] = None,
         deterministic: bool = False,
+        action_masks: Optional[np.ndarray] = None,
     ) -> Tuple[np.ndarray, Optional[Tuple[np.ndarray, ...]]]:
+        """`action_masks` allows acting in envs other than self.env"""
         if not deterministic and np.random.rand() < self.exploration_rate:
-            action = self.sample_possible_actions()
-        else:
+            if action_masks is None:
+                return self.sample_possible_actions(), state
+            return (
+                np.array([np.random.choice(np.flatnonzero(m)) for m in action_masks]),
+                state,
+            )
+
+        self._action_masks_override = action_masks
+        try:
             action, state = self.policy.predict(
                 observation, state, episode_start, deterministic
             )
+        finally:
+            self._action_masks_override = None
         return action, state
 
     def _sample_action(
@@ -0,0 +1,243 @@
+import hashlib
+import json
+import os
+import statistics
+from collections import OrderedDict
+
+import numpy as np
+from sb3_contrib.common.maskable.utils import get_action_masks
+from stable_baselines3.common.evaluation import evaluate_policy
+
+
+"""
+Evaluation of a policy on a fixed list of sim seeds. The seeds are spread over
+the workers of a VecEnv so every sim session plays its share in parallel, and
+the same seeds always give comparable numbers across checkpoints.
+"""
+
+PERCENTILES = (5, 25, 50, 75, 95)
+BREAKDOWN = ("ability_dps", "melee_dps", "disease_dps")
+# what is kept of an episode's final info
+EPISODE_FIELDS = ("dps", "is_success", "steps") + BREAKDOWN
+
+
+def evaluate_dps(model, env, n_episodes):
+    """Mean DPS of `n_episodes` deterministic episodes that ran to completion"""
+    dps = []
+
+    def collect_dps(locals_, globals_):
+        if locals_["done"] and locals_["info"]["is_success"]:
+            dps.append(locals_["info"]["dps"])
+
+    evaluate_policy(
+        model,
+        env,
+        n_eval_episodes=n_episodes,
+        deterministic=True,
+        callback=collect_dps,
+    )
+    return statistics.mean(dps) if dps else 0.0
+
+
+def evaluate_training_dps(model, env, n_episodes):
+    """
+    evaluate_dps on the env `model` trains on. The normalizer statistics stay
+    frozen meanwhile, and the next rollout starts from fresh episodes since
+    evaluation moved the workers past the model's last observations.
+    """
+    training = env.training
+    env.training = False
+    try:
+        return evaluate_dps(model, env, n_episodes)
+    finally:
+        model._last_obs = env.reset()
+        model._last_episode_starts = np.ones((env.num_envs,), dtype=bool)
+        env.training = training
+
+
+def run_seeded_episodes(model, env, seeds, deterministic=True):
+    """
+    Play one episode per seed on the VecEnv `env` and return the final info
+    of each, in the order of `seeds`.
+    """
+    num_envs = env.num_envs
+    assigned = [list(seeds[i::num_envs]) for i in range(num_envs)]
+    for i, worker_seeds in enumerate(assigned):
+        env.env_method("queue_seeds", worker_seeds, indices=i)
+
+    finished = [[] for _ in range(num_envs)]
+    observations = env.reset()
+    while any(len(f) < len(a) for f, a in zip(finished, assigned)):
+        actions, _ = model.predict(
+            observations,
+            deterministic=deterministic,
+            action_masks=get_action_masks(env),
+        )
+        observations, _, dones, infos = env.step(actions)
+        for i in np.flatnonzero(dones):
+            # workers that are done with their seeds keep playing, ignore them
+            if len(finished[i]) < len(assigned[i]):
+                finished[i].append({name: infos[i][name] for name in EPISODE_FIELDS})
+
+    infos_by_seed = {
+        seed: info
+        for worker_seeds, worker_infos in zip(assigned, finished)
+        for seed, info in zip(worker_seeds, worker_infos)
+    }
+    return [infos_by_seed[seed] for seed in seeds]
+
+
+def bootstrap_ci(values, confidence=0.95, num_resamples=1000, seed=0):
+    """Bootstrap confidence interval of the mean of `values`"""
+    rng = np.random.default_rng(seed)
+    means = rng.choice(values, size=(num_resamples, len(values))).mean(axis=1)
+    tail = (1 - confidence) / 2
+    low, high = np.quantile(means, [tail, 1 - tail])
+    return float(low), float(high)
+
+
+def summarize_episodes(seeds, infos):
+    completed = [(seed, info) for seed, info in zip(seeds, infos) if info["is_success"]]
+    dps = np.array([info["dps"] for _, info in completed], dtype=np.float64)
+    if not len(dps):
+        return dict(episodes=len(infos), completed=0)
+    return dict(
+        episodes=len(infos),
+        completed=len(dps),
+        mean=float(dps.mean()),
+        std=float(dps.std()),
+        percentiles={
+            str(p): float(value)
+            for p, value in zip(PERCENTILES, np.percentile(dps, PERCENTILES))
+        },
+        ci95=bootstrap_ci(dps),
+        breakdown={
+            name: float(np.mean([info[name] for _, info in completed]))
+            for name in BREAKDOWN
+        },
+        dps_by_seed={str(seed): info["dps"] for seed, info in completed},
+    )
+
+
+def _sha256(*parts):
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part)
+    return digest.hexdigest()
+
+
+def weights_hash(model):
+    state_dict = model.policy.state_dict()
+    return _sha256(
+        *(
+            part
+            for name in sorted(state_dict)
+            for part in (name.encode(), state_dict[name].cpu().numpy().tobytes())
+        )
+    )
+
+
+def evaluation_keys(model, env, seeds):
+    """
+    Content-addressed cache keys of evaluating `model` on `env` for each seed:
+    the policy weights, the normalizer state, the sim config and env settings
+    """
+    scale, offset = env.normalization_constants()
+    normalizer = _sha256(
+        np.asarray(scale, dtype=np.float32).tobytes(),
+        np.asarray(offset, dtype=np.float32).tobytes(),
+    )
+    context = json.dumps(
+        [weights_hash(model), normalizer, env.env_method("get_settings", indices=0)[0]],
+        sort_keys=True,
+    )
+    return {seed: _sha256(context.encode(), str(seed).encode()) for seed in seeds}
+
+
+class EvaluationCache:
+    """
+    Episode results by evaluation key in a JSON file, kept in least recently
+    used order and trimmed to `max_entries` on save.
+    """
+
+    def __init__(self, path, max_entries=100000):
+        self.path = path
+        self._max_entries = max_entries
+        self._entries = OrderedDict()
+        if os.path.exists(path):
+            with open(path) as f:
+                self._entries = json.load(f, object_pairs_hook=OrderedDict)
+
+    def get(self, key):
+        result = self._entries.get(key)
+        if result is not None:
+            self._entries.move_to_end(key)
+        return result
+
+    def put(self, key, result):
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+
+    def save(self):
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self._entries, f)
+        os.replace(tmp_path, self.path)
+
+
+def evaluate_seeds(model, env, seeds, cache=None):
+    """
+    DPS statistics of deterministic episodes on `seeds`. With a `cache`, only
+    the seeds it has no result for are played.
+    """
+    if cache is None:
+        return summarize_episodes(seeds, run_seeded_episodes(model, env, seeds))
+
+    keys = evaluation_keys(model, env, seeds)
+    infos = {seed: cache.get(keys[seed]) for seed in seeds}
+    missing = [seed for seed in seeds if infos[seed] is None]
+    if missing:
+        for seed, info in zip(missing, run_seeded_episodes(model, env, missing)):
+            infos[seed] = info
+            cache.put(keys[seed], info)
+    cache.save()
+    return summarize_episodes(seeds, [infos[seed] for seed in seeds])
+
+
+def format_evaluation(results):
+    if not results["completed"]:
+        return f"Evaluation: none of {results['episodes']} episodes completed"
+    percentiles = " ".join(
+        f"p{p}={value:.1f}" for p, value in results["percentiles"].items()
+    )
+    breakdown = " ".join(
+        f"{name.replace('_dps', '')}={value:.1f}"
+        for name, value in results["breakdown"].items()
+    )
+    low, high = results["ci95"]
+    return (
+        f"Evaluation over {results['completed']}/{results['episodes']} episodes: "
+        f"DPS mean {results['mean']:.1f} (95% CI {low:.1f}-{high:.1f}) "
+        f"std {results['std']:.1f}\n"
+        f"  {percentiles}\n"
+        f"  {breakdown}"
+    )
+
+
+def write_evaluation(path, checkpoint, results):
+    """Add `results` under `checkpoint` to the JSON file at `path`"""
+    evaluations = {}
+    if os.path.exists(path):
+        with open(path) as f:
+            evaluations = json.load(f)
+    evaluations[checkpoint] = results
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(evaluations, f, indent=2)
+    os.replace(tmp_path, path)
+    return path
@@ -0,0 +1,153 @@
+import copy
+import json
+from typing import Optional, Tuple
+
+import numpy as np
+import torch as th
+from sb3_contrib.common.maskable.utils import get_action_masks
+from torch import nn
+
+from model.dqn import MaskedDQN
+
+
+"""
+Export a trained model into a standalone TorchScript module holding only what
+action selection needs: frozen observation normalization, the policy network
+and action masking. CompiledPolicy runs it without stable-baselines3.
+"""
+
+# what kind of scores the module outputs, stored next to it in the archive
+METADATA_FILE = "policy.json"
+
+
+class _ActorLogits(nn.Module):
+    def __init__(self, policy):
+        super().__init__()
+        self.features_extractor = policy.pi_features_extractor
+        self.mlp_extractor = policy.mlp_extractor
+        self.action_net = policy.action_net
+
+    def forward(self, observations):
+        features = self.features_extractor(observations)
+        return self.action_net(self.mlp_extractor.forward_actor(features))
+
+
+class InferencePolicy(nn.Module):
+    """
+    Maps raw observations and action masks to masked action scores: logits
+    of a PPO policy, Q-values of a DQN
+    """
+
+    def __init__(self, logits_net: nn.Module, scale, offset):
+        super().__init__()
+        self.logits_net = logits_net
+        self.register_buffer("scale", th.as_tensor(scale, dtype=th.float32))
+        self.register_buffer("offset", th.as_tensor(offset, dtype=th.float32))
+
+    def forward(self, observations, action_masks):
+        logits = self.logits_net(observations * self.scale + self.offset)
+        return logits.masked_fill(~action_masks, -th.inf)
+
+
+def _logits_net(model):
+    if isinstance(model, MaskedDQN):
+        q_net = model.q_net
+        # the Q-network itself holds a reference to the model for its masks
+        return nn.Sequential(
+            copy.deepcopy(q_net.features_extractor), copy.deepcopy(q_net.q_net)
+        )
+    return copy.deepcopy(_ActorLogits(model.policy))
+
+
+def _metadata(model):
+    if isinstance(model, MaskedDQN):
+        # stochastic actions are epsilon-greedy, like MaskedDQN.predict
+        return dict(scores="q_values", exploration_rate=model.exploration_rate)
+    return dict(scores="logits")
+
+
+def export_policy(model, path, scale=None, offset=None):
+    """
+    Trace `model`'s policy into a TorchScript file at `path`, along with
+    how to sample from its scores.
+
+    `scale` and `offset` are frozen normalization constants (see
+    normalization_constants); leave them unset when the observations are
+    already normalized by the env.
+    """
+    obs_dim = model.observation_space.shape[0]
+    n_actions = model.action_space.n
+    if scale is None:
+        scale = np.ones(obs_dim)
+    if offset is None:
+        offset = np.zeros(obs_dim)
+
+    module = InferencePolicy(_logits_net(model), scale, offset).to("cpu").eval()
+    with th.no_grad():
+        traced = th.jit.trace(
+            module,
+            (th.zeros(1, obs_dim), th.ones(1, n_actions, dtype=th.bool)),
+        )
+    th.jit.save(
+        traced, path, _extra_files={METADATA_FILE: json.dumps(_metadata(model))}
+    )
+    return path
+
+
+class CompiledPolicy:
+    """
+    Runs an exported policy. `predict` matches the stable-baselines3 signature,
+    so it can be used with evaluate_policy; masks are fetched from `env` when
+    they are not passed in.
+    """
+
+    def __init__(self, path, env=None, num_threads: Optional[int] = None):
+        if num_threads is not None:
+            th.set_num_threads(num_threads)
+        extra_files = {METADATA_FILE: ""}
+        self._module = th.jit.load(
+            path, map_location="cpu", _extra_files=extra_files
+        ).eval()
+        metadata = extra_files[METADATA_FILE]
+        # exports without metadata are from PPO models
+        self.metadata = json.loads(metadata) if metadata else dict(scores="logits")
+        self.env = env
+
+    def predict(
+        self,
+        observation: np.ndarray,
+        state: Optional[Tuple[np.ndarray, ...]] = None,
+        episode_start: Optional[np.ndarray] = None,
+        deterministic: bool = True,
+        action_masks: Optional[np.ndarray] = None,
+    ) -> Tuple[np.ndarray, Optional[Tuple[np.ndarray, ...]]]:
+        if action_masks is None:
+            action_masks = get_action_masks(self.env)
+
+        observation = np.asarray(observation, dtype=np.float32)
+        action_masks = np.asarray(action_masks, dtype=bool)
+        vectorized = observation.ndim == 2
+        if not vectorized:
+            observation = observation[None]
+            action_masks = action_masks[None]
+
+        with th.inference_mode():
+            scores = self._module(
+                th.from_numpy(observation), th.from_numpy(action_masks)
+            )
+            if deterministic:
+                actions = scores.argmax(dim=1)
+            elif self.metadata["scores"] == "q_values":
+                if np.random.rand() < self.metadata["exploration_rate"]:
+                    actions = th.as_tensor(
+                        [np.random.choice(np.flatnonzero(m)) for m in action_masks]
+                    )
+                else:
+                    actions = scores.argmax(dim=1)
+            else:
+                actions = th.distributions.Categorical(logits=scores).sample()
+
+        actions = actions.numpy()
+        if not vectorized:
+            actions = actions[0]
+        return actions, None
@@ -1,96 +1,423 @@
+import copy
 import math
 import os
+import signal
+import time
+from functools import partial
 
+import torch as th
 from gym.wrappers import FlattenObservation
-from stable_baselines3.common.env_util import make_vec_env
-from stable_baselines3.common.evaluation import evaluate_policy
-from stable_baselines3.common.vec_env import SubprocVecEnv
+from stable_baselines3.common.monitor import Monitor
+from stable_baselines3.common.vec_env import DummyVecEnv, SubprocVecEnv
 
+from model.async_learner import AsyncLearner
+from model.callbacks import CurriculumCallback, EvalCallback, StopCallback
+from model.checkpoints import (
+    CheckpointManager,
+    capture_resume_state,
+    latest_checkpoint,
+    load_resume_state,
+    restore_resume_state,
+)
+from model.control import StopRequest
 from model.dqn import MaskedDQN, MaskedPolicy
+from model.evaluation import (
+    EvaluationCache,
+    evaluate_seeds,
+    format_evaluation,
+    write_evaluation,
+)
+from model.export import export_policy
+from model.pbt import PopulationTrainer
 from model.ppo import MaskablePPO
+from model.pretrain import pretrain
+from model.profiling import ProfiledEnv, ProfilerCallback, merge_profiles
+from environment.curriculum import DurationCurriculum
 from environment.environment import WoWSimsEnv
-from environment.normalization import NormalizeObservation
+from environment.normalization import (
+    NormalizeObservation,
+    VecNormalizeObservation,
+    VecStaticNormalizeObservation,
+    fit_obs_rms,
+)
+from environment.recording import TrajectoryDataset, TrajectoryRecorder
+from environment.trace import export_traces
+from agent.sim_agent import DEFAULT_ENDPOINT
+from logger.metrics import MetricsConsumer, MetricsSink
 
 
-def policy_callback(locals, globals_):
-    if locals["info"]["is_success"]:
-        print("DPS", locals["info"]["dps"], "Steps", locals["info"]["steps"])
+# in requirements.txt, without it only libraries loaded after
+# configure_threads respect the thread budget
+try:
+    from threadpoolctl import threadpool_info, threadpool_limits
+except ImportError:
+    threadpool_info = threadpool_limits = None
 
+EVALUATION_CACHE = "./evaluations/cache.json"
+# model selection (EVAL_FREQ, DAEMON) evaluates on seeds from here on, so the
+# final evaluation on seeds 0..EVAL_EPISODES-1 stays an unbiased test
+SELECTION_SEED_OFFSET = 1000000
 
-def create_env(**kwargs):
+THREAD_ENV_VARS = ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS")
+
+
+def thread_budget(role):
+    """Env workers get a single thread, the learner LEARNER_THREADS (all cores)"""
+    if role == "env":
+        return 1
+    return int(os.environ.get("LEARNER_THREADS", os.cpu_count()))
+
+
+def configure_threads(role):
+    """Set the torch, OpenMP and BLAS thread budget of this process"""
+    num_threads = thread_budget(role)
+    # picked up by libraries loaded from now on and by child processes
+    for name in THREAD_ENV_VARS:
+        os.environ[name] = str(num_threads)
+    th.set_num_threads(num_threads)
+    # pools of already loaded BLAS / OpenMP libraries
+    if threadpool_limits is not None:
+        threadpool_limits(num_threads)
+    return num_threads
+
+
+def report_threads():
+    print(
+        "Threads: torch intra-op",
+        th.get_num_threads(),
+        "inter-op",
+        th.get_num_interop_threads(),
+        *[f"{name}={os.environ.get(name)}" for name in THREAD_ENV_VARS],
+    )
+    if threadpool_info is not None:
+        for pool in threadpool_info():
+            print(
+                "Threads:", pool["internal_api"], pool["num_threads"], pool["filepath"]
+            )
+    else:
+        print("Threads: threadpoolctl is not installed, BLAS pools are not capped")
+    print(
+        "Threads: learner",
+        thread_budget("learner"),
+        "env workers",
+        thread_budget("env"),
+        "each",
+    )
+
+
+def create_env(
+    profile_dir=None, profile_seconds=None, record_dir=None, normalize=True, **kwargs
+):
     env = WoWSimsEnv(**kwargs)
     env = FlattenObservation(env)
-    env = NormalizeObservation(env)
+    if record_dir is not None:
+        env = TrajectoryRecorder(env, record_dir)
+    if normalize:
+        env = NormalizeObservation(env)
+    if profile_dir is not None:
+        env = ProfiledEnv(env, profile_dir, profile_seconds)
     return env
 
 
-def create_multi_env(num_envs, env_kwargs):
-    return make_vec_env(
-        create_env,
-        n_envs=num_envs,
-        vec_env_cls=SubprocVecEnv,
-        vec_env_kwargs=dict(start_method="fork"),
-        env_kwargs=env_kwargs,
+def parse_endpoints(value):
+    return [endpoint.strip() for endpoint in value.split(",") if endpoint.strip()]
+
+
+def create_env_fns(
+    num_envs, env_kwargs, endpoints, normalize=False, ignore_stop_signals=False
+):
+    """
+    Env factories for worker processes. They leave normalization to a
+    VecNormalizeObservation unless `normalize` is set.
+    """
+
+    # spread the workers round-robin over the sim servers
+    def make_env(rank):
+        def _init():
+            configure_threads("env")
+            if ignore_stop_signals:
+                # a stop signal may reach the whole process group, the learner
+                # closes its workers once it evaluated and checkpointed
+                for signum in (signal.SIGINT, signal.SIGTERM):
+                    signal.signal(signum, signal.SIG_IGN)
+            env = create_env(
+                sim_endpoint=endpoints[rank % len(endpoints)],
+                normalize=normalize,
+                **env_kwargs,
+            )
+            return Monitor(env)
+
+        return _init
+
+    return [make_env(rank) for rank in range(num_envs)]
+
+
+def create_multi_env(num_envs, env_kwargs, endpoints, ignore_stop_signals=False):
+    return SubprocVecEnv(
+        create_env_fns(
+            num_envs, env_kwargs, endpoints, ignore_stop_signals=ignore_stop_signals
+        ),
+        start_method="fork",
     )
 
 
-def create_single_env(env_kwargs):
-    return create_env(**env_kwargs)
+def create_single_env(env_kwargs, endpoints):
+    # runs in the learner process, so it keeps the learner's thread budget,
+    # and its steps already show up in the learner's profile
+    env_kwargs = {
+        name: value
+        for name, value in env_kwargs.items()
+        if name not in ("profile_dir", "profile_seconds")
+    }
+    return DummyVecEnv(
+        [
+            lambda: Monitor(
+                create_env(sim_endpoint=endpoints[0], normalize=False, **env_kwargs)
+            )
+        ]
+    )
 
 
-def initialize_environment(count, env_kwargs):
+def initialize_environment(
+    count,
+    env_kwargs,
+    endpoints=(DEFAULT_ENDPOINT,),
+    normalization="minmax",
+    ignore_stop_signals=False,
+):
     if count == 1:
-        return create_single_env(env_kwargs)
-    return create_multi_env(count, env_kwargs)
+        env = create_single_env(env_kwargs, endpoints)
+    else:
+        env = create_multi_env(count, env_kwargs, endpoints, ignore_stop_signals)
+    if normalization == "static":
+        return VecStaticNormalizeObservation(env)
+    return VecNormalizeObservation(env, scaling=normalization)
 
 
-def initialize_model(env, verbose, model_name=None):
-    model_type = os.environ.get("MODEL_TYPE", "PPO")
+def create_eval_env(
+    count, env_kwargs, endpoints, normalization="minmax", ignore_stop_signals=False
+):
+    """Full length episodes that don't record, trace or report metrics"""
+    eval_env_kwargs = {
+        name: value
+        for name, value in env_kwargs.items()
+        if name not in ("record_dir", "profile_dir", "profile_seconds")
+    }
+    eval_env_kwargs.update(trace=False, metrics_sink=None, max_episode_steps=None)
+    return initialize_environment(
+        count, eval_env_kwargs, endpoints, normalization, ignore_stop_signals
+    )
+
+
+def create_model(model_type, env, verbose, **model_kwargs):
     if model_type == "PPO":
-        model = MaskablePPO("MlpPolicy", env, verbose=verbose)
+        return MaskablePPO("MlpPolicy", env, verbose=verbose, **model_kwargs)
     elif model_type == "DQN":
-        model = MaskedDQN(MaskedPolicy, env, verbose=verbose)
+        return MaskedDQN(MaskedPolicy, env, verbose=verbose, **model_kwargs)
     else:
         assert False, "%s is not a valid model type" % model_type
+
+
+def initialize_model(env, verbose, model_name=None, pretrain_dir=None):
+    model_type = os.environ.get("MODEL_TYPE", "PPO")
+    model = create_model(model_type, env, verbose)
     if model_name == None:
         model_name = model.__class__.__name__
-    load_latest_file(model, env, model_name)
+    loaded_model = load_latest_file(model, env, model_name)
+    if loaded_model is not None:
+        model = loaded_model
+    elif pretrain_dir is not None:
+        pretrain_from_dataset(model, env, pretrain_dir)
     return model, model_name
 
 
-def find_highest_file_index(model_name):
-    if not os.path.exists(f"./models/{model_name}/"):
-        print("no path")
-        return -1
-    return max(
-        [int(f[: f.index(".")]) for f in os.listdir(f"./models/{model_name}/")],
-        default=-1,
+def pretrain_from_dataset(model, env, dataset_dir):
+    assert os.path.isdir(dataset_dir), "%s is not a valid PRETRAIN_DIR" % dataset_dir
+    dataset = TrajectoryDataset(dataset_dir)
+    num_steps = dataset.num_steps
+    assert num_steps > 0, "PRETRAIN_DIR %s has no recorded steps" % dataset_dir
+    epochs = int(os.environ.get("PRETRAIN_EPOCHS", 5))
+    print(f"Pretraining on {num_steps} recorded steps from {dataset_dir}...")
+
+    # start the env normalizers from the dataset's statistics so the policy
+    # sees the same inputs online as it did during pretraining
+    env.set_obs_rms(fit_obs_rms(dataset))
+    scale, offset = env.normalization_constants()
+
+    pretrain(
+        model,
+        dataset,
+        epochs=epochs,
+        normalize=lambda observations: observations * scale + offset,
     )
+    print("Done pretraining")
+
 
+def checkpoint_dir(model_name):
+    return f"./models/{model_name}/"
 
-def save_file(model, model_name):
-    new_file_index = find_highest_file_index(model_name) + 1
-    model_save_path = f"./models/{model_name}/{new_file_index}"
-    print(f"Saving model to {model_save_path}.zip...")
-    model.save(model_save_path, exclude=["policy_kwargs"])
-    print("Done saving model")
+
+def save_file(checkpoints, model, env, dps=None, test_dps=None):
+    model_save_path = checkpoints.save(
+        model,
+        exclude=["policy_kwargs"],
+        dps=dps,
+        test_dps=test_dps,
+        resume_state=capture_resume_state(env),
+    )
+    print(f"Saving model to {model_save_path} in the background")
     return model_save_path
 
 
 def load_latest_file(model, env, model_name):
-    fileIndex = find_highest_file_index(model_name)
-    if fileIndex == -1:
+    """
+    Load the latest checkpoint, including optimizer state, timestep counters
+    and resume state. Returns the loaded model, or None if there is none.
+    """
+    model_load_path = latest_checkpoint(checkpoint_dir(model_name))
+    if model_load_path is None:
         print("There is no existing model to load, starting learning from scratch")
+        return None
+    print(f"Loading existing model from {model_load_path}...")
+    model = model.load(model_load_path, env=env)
+    resume_state = load_resume_state(model_load_path)
+    if resume_state is not None:
+        restore_resume_state(env, resume_state)
+    print(f"Done loading model at {model.num_timesteps} timesteps")
+    return model
+
+
+def train_population(
+    population_size,
+    environment_count,
+    env_kwargs,
+    endpoints,
+    verbose,
+    total_timesteps,
+    normalization="minmax",
+):
+    """
+    Split the env workers between POPULATION_SIZE PPO members, train them with
+    population based training and return the best member's model and env.
+    """
+    envs = [
+        initialize_environment(
+            max(1, environment_count // population_size),
+            env_kwargs,
+            # so small partitions don't all start on the first sim server
+            endpoints[i % len(endpoints) :] + endpoints[: i % len(endpoints)],
+            normalization,
+        )
+        for i in range(population_size)
+    ]
+    # the population shares the sim budget of a single run
+    member_timesteps = total_timesteps // population_size
+    trainer = PopulationTrainer(
+        partial(create_model, "PPO", verbose=verbose),
+        envs,
+        interval_timesteps=int(
+            os.environ.get("PBT_INTERVAL_TIMESTEPS", max(1, member_timesteps // 10))
+        ),
+        max_episode_steps=env_kwargs.get("max_episode_steps"),
+    )
+    best = trainer.train(member_timesteps)
+    for env in envs:
+        if env is not best.env:
+            env.close()
+    return best.model, best.env
+
+
+def evaluate_and_save(
+    model, env, eval_env, model_name, checkpoints, seeds, cache, selection=False
+):
+    """
+    Evaluate on `eval_env` with the frozen normalizer statistics of the
+    training env `env`, then checkpoint with the evaluation DPS as model
+    `selection` score or as test score.
+    """
+    if eval_env is not env:
+        eval_env.set_obs_rms(copy.deepcopy(env.obs_rms))
+    eval_env.training = False
+    evaluation = evaluate_seeds(model, eval_env, seeds, cache)
+    print(format_evaluation(evaluation))
+    if selection:
+        model_save_path = save_file(checkpoints, model, env, dps=evaluation.get("mean"))
     else:
-        model_load_path = f"./models/{model_name}/{fileIndex}"
-        assert os.path.exists(f"{model_load_path}.zip")
-        print(f"Loading existing model from {model_load_path}.zip...")
-        model.load(model_load_path, env=env)
-        print("Done loading model")
+        model_save_path = save_file(
+            checkpoints, model, env, test_dps=evaluation.get("mean")
+        )
+    evaluation_path = write_evaluation(
+        f"./evaluations/{model_name}.json", model_save_path, evaluation
+    )
+    print(f"Saved evaluation to {evaluation_path}")
+    return model_save_path
+
+
+def train_daemon(
+    model,
+    env,
+    eval_env,
+    model_name,
+    checkpoints,
+    callbacks,
+    total_timesteps,
+    selection_seeds,
+    cache,
+    stop_request,
+):
+    """
+    Train, evaluate and checkpoint in a loop, keeping the workers and the
+    model in memory, until a stop is requested or evaluation plateaus.
+    """
+    callbacks = callbacks + [StopCallback(stop_request)]
+    iteration = 0
+    while True:
+        model.learn(
+            total_timesteps=total_timesteps,
+            callback=callbacks,
+            progress_bar=True,
+            reset_num_timesteps=False,
+        )
+        iteration += 1
+        if stop_request.requested or any(
+            getattr(callback, "plateaued", False) for callback in callbacks
+        ):
+            # the final evaluation and checkpoint are left to the caller
+            return
+        print(f"Finished training iteration {iteration}")
+        evaluate_and_save(
+            model,
+            env,
+            eval_env,
+            model_name,
+            checkpoints,
+            selection_seeds,
+            cache,
+            selection=True,
+        )
+
+
+def export_compiled_policy(model, env, model_save_path):
+    # freeze the normalizer so the exported policy runs on raw observations,
+    # e.g. with create_env(normalize=False)
+    scale, offset = env.normalization_constants()
+    export_path = export_policy(
+        model, f"{os.path.splitext(model_save_path)[0]}.pt", scale, offset
+    )
+    print(f"Exported compiled policy to {export_path}")
+
+
+def save_traces(env, model_name):
+    traces = [trace for pair in env.env_method("get_traces") for trace in pair]
+    os.makedirs("./traces/", exist_ok=True)
+    trace_path = export_traces(f"./traces/{model_name}.json", traces)
+    if trace_path is not None:
+        print(f"Saved best and worst episode traces to {trace_path}")
 
 
 def learn():
     verbose = bool(int(os.environ.get("VERBOSE", 0)))
+    trace = bool(int(os.environ.get("TRACE", 0)))
     model_name = os.environ.get("MODEL_NAME", None)
     environment_count = int(os.environ.get("ENVIRONMENT_COUNT", 16))
     episode_duration_seconds = int(os.environ.get("EPISODE_DURATION_SECONDS", 60))
@@ -101,32 +428,190 @@ def learn():
         os.environ.get("EPISODES_PER_TRAINING_ITERATION", 400)
     )
     reward_type = os.environ.get("REWARD_TYPE", "delta_damage")
+    endpoints = parse_endpoints(os.environ.get("SIM_ENDPOINT", DEFAULT_ENDPOINT))
+    metrics_interval_seconds = float(os.environ.get("METRICS_INTERVAL_SECONDS", 10))
+    profile = bool(int(os.environ.get("PROFILE", 0)))
+    profile_seconds = float(os.environ.get("PROFILE_SECONDS", 60))
+    record_dir = os.environ.get("RECORD_DIR", None)
+    pretrain_dir = os.environ.get("PRETRAIN_DIR", None)
+    export = bool(int(os.environ.get("EXPORT_POLICY", 0)))
+    asynchronous = bool(int(os.environ.get("ASYNC", 0)))
+    max_episode_steps = os.environ.get("MAX_EPISODE_STEPS", None)
+    population_size = int(os.environ.get("POPULATION_SIZE", 0))
+    # minmax or standard running statistics, or static declared bounds
+    normalization = os.environ.get("NORMALIZATION", "minmax")
+    # the same seeds every run, so evaluations of checkpoints are comparable
+    eval_seeds = list(range(int(os.environ.get("EVAL_EPISODES", 20))))
+    assert (
+        len(eval_seeds) <= SELECTION_SEED_OFFSET
+    ), "%s is not a valid EVAL_EPISODES" % len(eval_seeds)
+    eval_cache_size = int(os.environ.get("EVAL_CACHE_SIZE", 100000))
+    # evaluate every EVAL_FREQ timesteps during training, keep the best model
+    # and stop after EVAL_PATIENCE evaluations without improvement
+    eval_freq = int(os.environ.get("EVAL_FREQ", 0))
+    selection_seeds = list(
+        range(
+            SELECTION_SEED_OFFSET,
+            SELECTION_SEED_OFFSET + int(os.environ.get("EVAL_FREQ_EPISODES", 8)),
+        )
+    )
+    eval_patience = int(os.environ.get("EVAL_PATIENCE", 0))
+    eval_environment_count = int(os.environ.get("EVAL_ENVIRONMENT_COUNT", 4))
+    # keep training in iterations of EPISODES_PER_TRAINING_ITERATION until
+    # SIGTERM / SIGINT or STOP_FILE shows up
+    daemon = bool(int(os.environ.get("DAEMON", 0)))
+    stop_file = os.environ.get("STOP_FILE", "./STOP")
+    # e.g. "15,30,60": start with 15 second encounters and grow them as DPS
+    # plateaus, EPISODE_DURATION_SECONDS is still used for evaluation
+    curriculum_durations = [
+        int(d) for d in os.environ.get("CURRICULUM_DURATIONS", "").split(",") if d
+    ]
+    configure_threads("learner")
+    report_threads()
     steps_per_episode = math.ceil(
         (episode_duration_seconds * 1000) / simulation_step_duration_msec
     )
+    metrics_sink = MetricsSink()
     env_kwargs = dict(
         sim_duration_seconds=episode_duration_seconds,
         sim_step_duration_msec=simulation_step_duration_msec,
         reward_type=reward_type,
         verbose=verbose,
+        trace=trace,
+        metrics_sink=metrics_sink,
     )
-    env = initialize_environment(environment_count, env_kwargs)
-    model, model_name = initialize_model(env, verbose, model_name)
-
-    model.learn(
-        total_timesteps=(steps_per_episode * episodes_per_training_iteration),
-        progress_bar=True,
-    )
-    evaluate_policy(
-        model,
-        env,
-        n_eval_episodes=20,
-        deterministic=True,
-        callback=policy_callback,
-        render=False,
+    if record_dir is not None:
+        env_kwargs.update(record_dir=record_dir)
+    if max_episode_steps is not None:
+        env_kwargs.update(max_episode_steps=int(max_episode_steps))
+    if os.environ.get("MODEL_TYPE", "PPO") == "DQN":
+        env_kwargs.update(action_mask_info=True)
+    if curriculum_durations:
+        # encounters vary in length, let the policy see how much time is left;
+        # MAX_EPISODE_STEPS doesn't change the encounter, so it leaves the
+        # observation layout alone
+        env_kwargs.update(time_remaining_observation=True)
+    callbacks = []
+    if profile:
+        profile_dir = f"./profiles/{time.strftime('%Y%m%d-%H%M%S')}/"
+        env_kwargs.update(profile_dir=profile_dir, profile_seconds=profile_seconds)
+        callbacks.append(ProfilerCallback(profile_dir, profile_seconds))
+    if curriculum_durations:
+        callbacks.append(
+            CurriculumCallback(DurationCurriculum(curriculum_durations), verbose=1)
+        )
+    metrics_consumer = MetricsConsumer(metrics_sink, metrics_interval_seconds)
+    metrics_consumer.start()
+    eval_cache = EvaluationCache(EVALUATION_CACHE, eval_cache_size)
+    total_timesteps = steps_per_episode * episodes_per_training_iteration
+    if population_size:
+        assert not daemon, "POPULATION_SIZE doesn't support DAEMON"
+        # members train concurrently, callbacks can't be shared between them
+        assert not profile, "POPULATION_SIZE doesn't support PROFILE"
+        assert (
+            not curriculum_durations
+        ), "POPULATION_SIZE doesn't support CURRICULUM_DURATIONS"
+        assert not eval_freq, "POPULATION_SIZE doesn't support EVAL_FREQ"
+        model, env = train_population(
+            population_size,
+            environment_count,
+            env_kwargs,
+            endpoints,
+            verbose,
+            total_timesteps,
+            normalization,
+        )
+        if model_name is None:
+            model_name = "PBT"
+        checkpoints = CheckpointManager(checkpoint_dir(model_name))
+    elif asynchronous:
+        # actors run their own envs, this one normalizes their observations
+        # and is used for evaluation
+        assert not curriculum_durations, "ASYNC doesn't support CURRICULUM_DURATIONS"
+        assert not eval_freq, "ASYNC doesn't support EVAL_FREQ"
+        assert not daemon, "ASYNC doesn't support DAEMON"
+        env = initialize_environment(1, env_kwargs, endpoints, normalization)
+        model, model_name = initialize_model(env, verbose, model_name, pretrain_dir)
+        assert isinstance(model, MaskablePPO), "ASYNC only supports PPO"
+        checkpoints = CheckpointManager(checkpoint_dir(model_name))
+        learner = AsyncLearner(
+            model,
+            create_env_fns(environment_count, env_kwargs, endpoints),
+            env,
+        )
+        learner.learn(total_timesteps, callback=callbacks)
+    else:
+        # under DAEMON the workers outlive a stop signal, StopRequest
+        # handles it in this process
+        env = initialize_environment(
+            environment_count,
+            env_kwargs,
+            endpoints,
+            normalization,
+            ignore_stop_signals=daemon,
+        )
+        model, model_name = initialize_model(env, verbose, model_name, pretrain_dir)
+        checkpoints = CheckpointManager(checkpoint_dir(model_name))
+        if eval_freq or daemon:
+            eval_env = create_eval_env(
+                eval_environment_count,
+                env_kwargs,
+                endpoints,
+                normalization,
+                ignore_stop_signals=daemon,
+            )
+        try:
+            if eval_freq:
+                callbacks.append(
+                    EvalCallback(
+                        eval_env,
+                        selection_seeds,
+                        max(1, eval_freq // environment_count),
+                        checkpoints,
+                        patience=eval_patience or None,
+                        exclude=["policy_kwargs"],
+                        verbose=1,
+                    )
+                )
+            if daemon:
+                train_daemon(
+                    model,
+                    env,
+                    eval_env,
+                    model_name,
+                    checkpoints,
+                    callbacks,
+                    total_timesteps,
+                    selection_seeds,
+                    eval_cache,
+                    StopRequest(stop_file),
+                )
+            else:
+                model.learn(
+                    total_timesteps=total_timesteps,
+                    callback=callbacks,
+                    progress_bar=True,
+                    # continue the counters and schedules of a loaded model
+                    reset_num_timesteps=False,
+                )
+        finally:
+            if eval_freq or daemon:
+                eval_env.close()
+    # evaluate on full length episodes with frozen normalization statistics
+    env.env_method("set_episode_duration", episode_duration_seconds)
+    env.env_method("set_max_episode_steps", None)
+    model_save_path = evaluate_and_save(
+        model, env, env, model_name, checkpoints, eval_seeds, eval_cache
     )
-    save_file(model, model_name)
+    if export:
+        export_compiled_policy(model, env, model_save_path)
+    if trace:
+        save_traces(env, model_name)
+    checkpoints.close()
+    metrics_consumer.stop()
     env.close()
+    if profile:
+        print(f"Saved profiling report to {merge_profiles(profile_dir)}")
 
 
 if __name__ == "__main__":
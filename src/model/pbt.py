@@ -0,0 +1,169 @@
+import copy
+import math
+import random
+import threading
+
+from stable_baselines3.common.utils import get_schedule_fn
+
+from model.evaluation import evaluate_training_dps
+
+
+"""
+Population based training: K MaskablePPO members train concurrently, each on
+its own partition of the env workers. Every round they are evaluated, and the
+weakest members restart from a copy of a strong member (weights and optimizer
+state) with perturbed hyperparameters.
+"""
+
+# log-uniform ranges members are initialized from and perturbed within
+HYPERPARAMETERS = dict(
+    learning_rate=(1e-5, 1e-3),
+    ent_coef=(1e-4, 5e-2),
+    clip_range=(0.05, 0.4),
+)
+PERTURB_FACTORS = (0.8, 1.25)
+
+
+def sample_hyperparameters(rng):
+    return {
+        name: math.exp(rng.uniform(math.log(low), math.log(high)))
+        for name, (low, high) in HYPERPARAMETERS.items()
+    }
+
+
+def perturb_hyperparameters(hyperparameters, rng):
+    return {
+        name: min(high, max(low, value * rng.choice(PERTURB_FACTORS)))
+        for (name, value), (low, high) in zip(
+            hyperparameters.items(), HYPERPARAMETERS.values()
+        )
+    }
+
+
+def apply_hyperparameters(model, hyperparameters):
+    model.learning_rate = hyperparameters["learning_rate"]
+    model._setup_lr_schedule()
+    model.ent_coef = hyperparameters["ent_coef"]
+    model.clip_range = get_schedule_fn(hyperparameters["clip_range"])
+
+
+class Member:
+    def __init__(self, member_id, model, env, hyperparameters):
+        self.member_id = member_id
+        self.model = model
+        self.env = env
+        self.hyperparameters = hyperparameters
+        self.dps = 0.0
+
+    def copy_from(self, other, hyperparameters):
+        self.model.policy.load_state_dict(other.model.policy.state_dict())
+        self.model.policy.optimizer.load_state_dict(
+            other.model.policy.optimizer.state_dict()
+        )
+        # the copied policy expects inputs scaled like the ones it trained on
+        self.env.set_obs_rms(copy.deepcopy(other.env.obs_rms))
+        self.hyperparameters = hyperparameters
+        apply_hyperparameters(self.model, hyperparameters)
+
+
+class PopulationTrainer:
+    """
+    `model_fn(env, **hyperparameters)` builds a member's model, one member is
+    created per env in `envs`. Training episodes are truncated at
+    `max_episode_steps`, evaluation episodes always run to completion.
+    """
+
+    def __init__(
+        self,
+        model_fn,
+        envs,
+        interval_timesteps,
+        eval_episodes=8,
+        exploit_fraction=0.25,
+        seed=0,
+        max_episode_steps=None,
+        verbose=True,
+    ):
+        self._rng = random.Random(seed)
+        self._max_episode_steps = max_episode_steps
+        self._interval_timesteps = interval_timesteps
+        self._eval_episodes = eval_episodes
+        self._exploit_count = max(1, int(len(envs) * exploit_fraction))
+        self._verbose = verbose
+        self.members = []
+        for member_id, env in enumerate(envs):
+            hyperparameters = sample_hyperparameters(self._rng)
+            model = model_fn(env, **hyperparameters)
+            self.members.append(Member(member_id, model, env, hyperparameters))
+
+    def train(self, total_timesteps):
+        """Train every member for `total_timesteps` of its own"""
+        rounds = max(1, math.ceil(total_timesteps / self._interval_timesteps))
+        for round_index in range(rounds):
+            self._train_round()
+            for member in self.members:
+                member.dps = self._evaluate(member)
+            if self._verbose:
+                self._report(round_index)
+            if round_index < rounds - 1:
+                self._exploit_and_explore()
+        return self.best()
+
+    def _train_round(self):
+        # env stepping happens in worker processes and torch releases the GIL,
+        # so threads are enough to keep every member busy
+        errors = []
+
+        def train(member):
+            try:
+                member.model.learn(self._interval_timesteps, reset_num_timesteps=False)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [
+            threading.Thread(
+                target=train, args=(member,), name=f"pbt-{member.member_id}"
+            )
+            for member in self.members
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if errors:
+            raise errors[0]
+
+    def _evaluate(self, member):
+        # truncated episodes never complete
+        env = member.env
+        env.env_method("set_max_episode_steps", None)
+        try:
+            return evaluate_training_dps(member.model, env, self._eval_episodes)
+        finally:
+            env.env_method("set_max_episode_steps", self._max_episode_steps)
+
+    def _exploit_and_explore(self):
+        ranked = sorted(self.members, key=lambda member: member.dps, reverse=True)
+        for weak in ranked[-self._exploit_count :]:
+            strong = self._rng.choice(ranked[: self._exploit_count])
+            if strong is weak:
+                continue
+            weak.copy_from(
+                strong,
+                perturb_hyperparameters(strong.hyperparameters, self._rng),
+            )
+            if self._verbose:
+                print(f"PBT: member {weak.member_id} copied member {strong.member_id}")
+
+    def _report(self, round_index):
+        print(f"PBT round {round_index + 1}")
+        for member in sorted(self.members, key=lambda member: member.dps, reverse=True):
+            hyperparameters = ", ".join(
+                f"{name}={value:.3g}" for name, value in member.hyperparameters.items()
+            )
+            print(
+                f"  member {member.member_id}: {member.dps:.1f} DPS ({hyperparameters})"
+            )
+
+    def best(self):
+        return max(self.members, key=lambda member: member.dps)
@@ -4,8 +4,17 @@ import numpy as np
 import sb3_contrib
 from sb3_contrib.common.maskable.utils import get_action_masks
 
+from logger.timing import TIMING, timed
+
 
 class MaskablePPO(sb3_contrib.MaskablePPO):
+    def _setup_model(self) -> None:
+        super()._setup_model()
+        if TIMING:
+            # rollouts call the policy directly rather than through predict
+            self.policy.forward = timed("policy.forward")(self.policy.forward)
+
+    @timed("policy.predict")
     def predict(
         self,
         observation: np.ndarray,
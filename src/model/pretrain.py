@@ -0,0 +1,74 @@
+import numpy as np
+import torch as th
+from torch.nn import functional as F
+
+from model.dqn import MaskedDQN
+
+
+"""
+Behaviour cloning: fit the policy to recorded or scripted rotations before
+any online training, so PPO / DQN start from a sensible rotation.
+"""
+
+
+def masked_cross_entropy(model, observations, actions, action_masks):
+    if isinstance(model, MaskedDQN):
+        # treat Q-values as action preferences over the legal actions
+        logits = model.q_net(observations)
+        logits = logits.masked_fill(~action_masks, -th.inf)
+        return F.cross_entropy(logits, actions)
+
+    distribution = model.policy.get_distribution(
+        observations, action_masks=action_masks
+    )
+    return -distribution.log_prob(actions).mean()
+
+
+def pretrain(
+    model,
+    dataset,
+    epochs=1,
+    batch_size=256,
+    learning_rate=1e-3,
+    normalize=None,
+    verbose=True,
+):
+    """
+    Fit `model`'s policy to the actions in a TrajectoryDataset, streaming
+    batches from disk. `normalize` maps recorded observations to what the
+    policy sees during training.
+
+    Uses its own optimizer so the online optimizer state is left untouched.
+    """
+    policy = model.policy
+    policy.set_training_mode(True)
+    optimizer = th.optim.Adam(policy.parameters(), lr=learning_rate)
+
+    for epoch in range(epochs):
+        losses = []
+        for batch in dataset.iter_batches(
+            batch_size, columns=("observations", "actions", "action_masks")
+        ):
+            observations = batch["observations"]
+            if normalize is not None:
+                observations = normalize(observations)
+
+            loss = masked_cross_entropy(
+                model,
+                th.as_tensor(observations, dtype=th.float32, device=policy.device),
+                th.as_tensor(batch["actions"], dtype=th.long, device=policy.device),
+                th.as_tensor(batch["action_masks"], device=policy.device),
+            )
+            optimizer.zero_grad()
+            loss.backward()
+            th.nn.utils.clip_grad_norm_(policy.parameters(), 0.5)
+            optimizer.step()
+            losses.append(loss.item())
+
+        if verbose:
+            print(f"Pretraining epoch {epoch + 1}/{epochs}, loss {np.mean(losses)}")
+
+    if isinstance(model, MaskedDQN):
+        model.q_net_target.load_state_dict(model.q_net.state_dict())
+    policy.set_training_mode(False)
+    return model
@@ -0,0 +1,170 @@
+import cProfile
+import glob
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+
+import gym
+from stable_baselines3.common.callbacks import BaseCallback
+
+
+class Profiler:
+    """
+    Profiles the calling thread for a bounded window.
+
+    Runs cProfile for deterministic call statistics and a sampling thread that
+    records collapsed stacks for flame graphs. Each process writes
+    `<role>-<pid>.pstats` and `<role>-<pid>.collapsed` into `output_dir`.
+    cProfile only follows the thread that started it, so `stop` and
+    `maybe_stop` must be called from that thread as well.
+    """
+
+    def __init__(
+        self, output_dir, role, duration_seconds, sample_interval_seconds=0.005
+    ):
+        self._output_dir = output_dir
+        self._role = role
+        self._duration_seconds = duration_seconds
+        self._sample_interval_seconds = sample_interval_seconds
+        self._profile = cProfile.Profile()
+        self._stacks = Counter()
+        self._stopped = threading.Event()
+        self._sampler = None
+        self._thread_id = None
+        self._deadline = None
+        self.running = False
+
+    def start(self):
+        os.makedirs(self._output_dir, exist_ok=True)
+        self._thread_id = threading.get_ident()
+        self._deadline = time.perf_counter() + self._duration_seconds
+        self._sampler = threading.Thread(
+            target=self._sample, name="profiler-sampler", daemon=True
+        )
+        self._sampler.start()
+        self._profile.enable()
+        self.running = True
+
+    def maybe_stop(self):
+        if self.running and time.perf_counter() >= self._deadline:
+            self.stop()
+
+    def stop(self):
+        if not self.running:
+            return
+        self._profile.disable()
+        self._stopped.set()
+        self._sampler.join()
+        self.running = False
+
+        path = os.path.join(self._output_dir, f"{self._role}-{os.getpid()}")
+        self._profile.dump_stats(f"{path}.pstats")
+        with open(f"{path}.collapsed", "w") as f:
+            for stack, count in self._stacks.items():
+                f.write(f"{self._role};{stack} {count}\n")
+
+    def _sample(self):
+        while not self._stopped.wait(self._sample_interval_seconds):
+            if time.perf_counter() >= self._deadline:
+                return
+            frame = sys._current_frames().get(self._thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(
+                    f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+                )
+                frame = frame.f_back
+            if stack:
+                self._stacks[";".join(reversed(stack))] += 1
+
+
+class ProfiledEnv(gym.Wrapper):
+    """
+    Profiles the env worker process it is created in. Envs stepped in the
+    learner process must not be wrapped, the learner profile already counts
+    their time.
+    """
+
+    def __init__(self, env, output_dir, duration_seconds):
+        super().__init__(env)
+        self._profiler = Profiler(output_dir, "env", duration_seconds)
+        self._profiler.start()
+
+    def step(self, action):
+        result = self.env.step(action)
+        self._profiler.maybe_stop()
+        return result
+
+    def close(self):
+        self._profiler.stop()
+        return self.env.close()
+
+
+class ProfilerCallback(BaseCallback):
+    """Profiles the learner process for the first part of training"""
+
+    def __init__(self, output_dir, duration_seconds, verbose=0):
+        super().__init__(verbose)
+        self._profiler = Profiler(output_dir, "learner", duration_seconds)
+
+    def _on_training_start(self) -> None:
+        self._profiler.start()
+
+    def _on_step(self) -> bool:
+        self._profiler.maybe_stop()
+        return True
+
+    def _on_training_end(self) -> None:
+        self._profiler.stop()
+
+
+def merge_profiles(output_dir, limit=50):
+    """
+    Merge every process' profile in `output_dir` into `merged.pstats`,
+    `merged.collapsed` and a human readable `report.txt`.
+    """
+    stats_paths = sorted(
+        path
+        for path in glob.glob(os.path.join(output_dir, "*.pstats"))
+        if os.path.basename(path) != "merged.pstats"
+    )
+    if not stats_paths:
+        return None
+
+    stacks = Counter()
+    for path in glob.glob(os.path.join(output_dir, "*.collapsed")):
+        if os.path.basename(path) == "merged.collapsed":
+            continue
+        with open(path) as f:
+            for line in f:
+                stack, _, count = line.rstrip("\n").rpartition(" ")
+                stacks[stack] += int(count)
+    with open(os.path.join(output_dir, "merged.collapsed"), "w") as f:
+        for stack, count in stacks.most_common():
+            f.write(f"{stack} {count}\n")
+
+    report = io.StringIO()
+    report.write(f"Merged {len(stats_paths)} profiles\n")
+    for role in ("learner", "env"):
+        paths = [
+            path
+            for path in stats_paths
+            if os.path.basename(path).startswith(f"{role}-")
+        ]
+        if not paths:
+            continue
+        report.write(f"\n===== {role} ({len(paths)} processes) =====\n")
+        stats = pstats.Stats(*paths, stream=report)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(limit)
+        stats.sort_stats(pstats.SortKey.TIME).print_stats(limit)
+
+    pstats.Stats(*stats_paths).dump_stats(os.path.join(output_dir, "merged.pstats"))
+    report_path = os.path.join(output_dir, "report.txt")
+    with open(report_path, "w") as f:
+        f.write(report.getvalue())
+    return report_path
@@ -0,0 +1,268 @@
+import csv
+import itertools
+import json
+import multiprocessing
+import os
+import random
+import statistics
+import sys
+import time
+import traceback
+from multiprocessing.connection import wait
+
+from agent.sim_agent import DEFAULT_ENDPOINT
+from model.evaluation import evaluate_training_dps
+from model.learn import (
+    configure_threads,
+    create_model,
+    initialize_environment,
+    parse_endpoints,
+)
+
+
+"""
+Hyperparameter sweeps: run many short trials concurrently over a bounded pool
+of sim server sessions and cores, stop trials whose intermediate evaluation
+DPS falls below the median of their peers, and write a results table.
+
+    python src/model/sweep.py sweep.json
+
+where sweep.json looks like
+    {
+        "model_type": "PPO",
+        "space": {"reward_type": ["delta_damage", "guided"], "learning_rate": [1e-4, 3e-4]},
+        "base": {"sim_step_duration_msec": 50, "sim_duration_seconds": 60},
+        "num_trials": null,
+        "max_concurrent_trials": 4,
+        "envs_per_trial": 4,
+        "sessions_per_endpoint": 16,
+        "rung_timesteps": 50000,
+        "num_rungs": 4,
+        "eval_episodes": 8,
+        "min_trials_for_stopping": 3,
+        "output": "sweep_results.csv"
+    }
+
+Parameters in ENV_PARAMS configure the env, everything else is passed to the
+model constructor. Without num_trials the full grid is run, otherwise that
+many random points are sampled from it.
+"""
+
+ENV_PARAMS = ("reward_type", "sim_step_duration_msec", "sim_duration_seconds")
+# what trials use for ENV_PARAMS that neither base nor space set
+ENV_DEFAULTS = dict(
+    reward_type="delta_damage", sim_step_duration_msec=50, sim_duration_seconds=60
+)
+
+DEFAULTS = dict(
+    model_type="PPO",
+    space={},
+    base={},
+    num_trials=None,
+    max_concurrent_trials=4,
+    envs_per_trial=4,
+    sessions_per_endpoint=16,
+    rung_timesteps=50000,
+    num_rungs=4,
+    eval_episodes=8,
+    min_trials_for_stopping=3,
+    output="sweep_results.csv",
+)
+
+
+def generate_trials(space, base, num_trials=None, seed=0):
+    names = sorted(space)
+    grid = [
+        dict(zip(names, values))
+        for values in itertools.product(*[space[n] for n in names])
+    ]
+    if num_trials is not None:
+        grid = random.Random(seed).sample(grid, min(num_trials, len(grid)))
+    return [dict(base, **params) for params in grid]
+
+
+def _run_trial(params, settings, endpoints, num_threads, connection):
+    os.environ["LEARNER_THREADS"] = str(num_threads)
+    configure_threads("learner")
+
+    env_kwargs = dict(ENV_DEFAULTS)
+    env_kwargs.update({name: params[name] for name in ENV_PARAMS if name in params})
+    env_kwargs.update(action_mask_info=settings["model_type"] == "DQN")
+    model_kwargs = {
+        name: value for name, value in params.items() if name not in ENV_PARAMS
+    }
+    env = initialize_environment(settings["envs_per_trial"], env_kwargs, endpoints)
+    try:
+        model = create_model(settings["model_type"], env, 0, **model_kwargs)
+        for rung in range(settings["num_rungs"]):
+            model.learn(settings["rung_timesteps"], reset_num_timesteps=False)
+            dps = evaluate_training_dps(model, env, settings["eval_episodes"])
+            connection.send(("rung", rung, dps))
+            if connection.recv() == "stop":
+                return
+        connection.send(("done",))
+    finally:
+        env.close()
+
+
+def _trial_entrypoint(params, settings, endpoints, num_threads, connection):
+    try:
+        _run_trial(params, settings, endpoints, num_threads, connection)
+    except Exception:
+        connection.send(("failed", traceback.format_exc()))
+    finally:
+        connection.close()
+
+
+class SweepScheduler:
+    """Runs trials concurrently and stops the ones below the median per rung"""
+
+    def __init__(self, trials, settings, endpoints):
+        self._settings = settings
+        self._pending = list(enumerate(trials))
+        self._running = {}
+        self._rung_results = {}
+        self._results = {
+            trial_id: dict(params=params, dps=[], status="pending")
+            for trial_id, params in self._pending
+        }
+        # one slot per sim session a trial's env worker may open
+        self._free_sessions = [
+            endpoint
+            for _ in range(settings["sessions_per_endpoint"])
+            for endpoint in endpoints
+        ]
+        self._num_threads = max(
+            1, (os.cpu_count() or 1) // settings["max_concurrent_trials"]
+        )
+        self._context = multiprocessing.get_context("spawn")
+
+    def run(self):
+        while self._pending or self._running:
+            self._launch_trials()
+            connections = {
+                trial["connection"]: trial_id
+                for trial_id, trial in self._running.items()
+            }
+            for connection in wait(list(connections), timeout=1.0):
+                self._handle(connections[connection], connection)
+        return self._results
+
+    def _launch_trials(self):
+        envs_per_trial = self._settings["envs_per_trial"]
+        while (
+            self._pending
+            and len(self._running) < self._settings["max_concurrent_trials"]
+            and len(self._free_sessions) >= envs_per_trial
+        ):
+            trial_id, params = self._pending.pop(0)
+            sessions = self._free_sessions[:envs_per_trial]
+            del self._free_sessions[:envs_per_trial]
+
+            parent_connection, child_connection = self._context.Pipe()
+            process = self._context.Process(
+                target=_trial_entrypoint,
+                args=(
+                    params,
+                    self._settings,
+                    sessions,
+                    self._num_threads,
+                    child_connection,
+                ),
+            )
+            process.start()
+            child_connection.close()
+            self._running[trial_id] = dict(
+                process=process,
+                connection=parent_connection,
+                sessions=sessions,
+                start_time=time.time(),
+            )
+            self._results[trial_id]["status"] = "running"
+            print(f"Started trial {trial_id}: {params}")
+
+    def _handle(self, trial_id, connection):
+        result = self._results[trial_id]
+        try:
+            message = connection.recv()
+        except EOFError:
+            if result["status"] == "running":
+                result["status"] = "failed"
+            self._finish(trial_id)
+            return
+
+        if message[0] == "rung":
+            _, rung, dps = message
+            result["dps"].append(dps)
+            decision = "stop" if self._should_stop(rung, dps) else "continue"
+            self._rung_results.setdefault(rung, []).append(dps)
+            print(f"Trial {trial_id} rung {rung}: {dps:.1f} DPS, {decision}")
+            if decision == "stop":
+                result["status"] = "stopped"
+            connection.send(decision)
+        elif message[0] == "done":
+            result["status"] = "completed"
+        elif message[0] == "failed":
+            result["status"] = "failed"
+            print(f"Trial {trial_id} failed:\n{message[1]}")
+
+    def _should_stop(self, rung, dps):
+        peers = self._rung_results.get(rung, [])
+        if len(peers) < self._settings["min_trials_for_stopping"]:
+            return False
+        return dps < statistics.median(peers)
+
+    def _finish(self, trial_id):
+        trial = self._running.pop(trial_id)
+        trial["process"].join()
+        trial["connection"].close()
+        self._free_sessions.extend(trial["sessions"])
+        self._results[trial_id]["duration"] = time.time() - trial["start_time"]
+
+
+def write_results(path, results, num_rungs):
+    param_names = sorted({name for r in results.values() for name in r["params"]})
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(
+            ["trial", "status", "final_dps", "duration_seconds"]
+            + param_names
+            + [f"rung_{rung}_dps" for rung in range(num_rungs)]
+        )
+        ordered = sorted(
+            results.items(),
+            key=lambda item: item[1]["dps"][-1] if item[1]["dps"] else 0,
+            reverse=True,
+        )
+        for trial_id, result in ordered:
+            dps = result["dps"]
+            writer.writerow(
+                [
+                    trial_id,
+                    result["status"],
+                    dps[-1] if dps else "",
+                    round(result.get("duration", 0), 1),
+                ]
+                + [result["params"].get(name, "") for name in param_names]
+                + dps
+                + [""] * (num_rungs - len(dps))
+            )
+    return path
+
+
+def sweep(config):
+    settings = dict(DEFAULTS, **config)
+    trials = generate_trials(
+        settings["space"], settings["base"], settings["num_trials"]
+    )
+    endpoints = parse_endpoints(os.environ.get("SIM_ENDPOINT", DEFAULT_ENDPOINT))
+    print(f"Running {len(trials)} trials")
+    results = SweepScheduler(trials, settings, endpoints).run()
+    path = write_results(settings["output"], results, settings["num_rungs"])
+    print(f"Wrote sweep results to {path}")
+    return results
+
+
+if __name__ == "__main__":
+    with open(sys.argv[1]) as f:
+        sweep(json.load(f))
@@ -0,0 +1,36 @@
+import pytest
+
+from agent.loopback_server import LoopbackSimServer
+from agent.sim_agent import SimAgent, parse_endpoint
+from agent.sim_config import create_config
+
+
+@pytest.fixture
+def server():
+    server = LoopbackSimServer().start()
+    yield server
+    server.stop()
+
+
+def test_parse_endpoint():
+    assert parse_endpoint("tcp://127.0.0.1:1234")[1] == ("127.0.0.1", 1234)
+    assert parse_endpoint("unix:///tmp/sim-agent.sock")[1] == "/tmp/sim-agent.sock"
+    assert parse_endpoint("/tmp/sim-agent.sock")[1] == "/tmp/sim-agent.sock"
+    with pytest.raises(ValueError):
+        parse_endpoint("tcp://127.0.0.1")
+
+
+def test_tcp_round_trip(server):
+    agent = SimAgent(server.endpoint, step_duration_msec=50)
+    try:
+        state = agent.reset(create_config(random_seed=7, duration=5))
+        sim_config = state["request"]["RaidSimRequest"]
+        assert sim_config["simOptions"]["randomSeed"] == 7
+        assert sim_config["encounter"]["duration"] == 5
+        assert state["currentTime"] == 0
+
+        agent.do_nothing()
+        state = agent.get_state()
+        assert state["currentTime"] == 50
+    finally:
+        agent.close()